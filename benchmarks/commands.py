@@ -0,0 +1,135 @@
+"""Measure the wall time and peak memory of the changelogd commands.
+
+Each command runs in a separate process on a synthetic `changelog.d` directory,
+with the number of entries and releases equal to the scale.
+
+Usage: python benchmarks/commands.py [--scales 10,100,1000] [--formats md,rst]
+       [--types 5] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from generator import generate
+from generator import release_version
+
+
+class Measurement(typing.NamedTuple):
+    command: str
+    scale: int
+    format: str
+    seconds: float
+    peak_memory_mb: typing.Optional[float]
+    exit_code: int
+
+
+def run(
+    args: typing.List[str], cwd: Path, stdin: str = "\n"
+) -> typing.Tuple[float, typing.Optional[float], int]:
+    """Run the changelogd command, return its wall time, peak memory and exit code.
+
+    The input is used to answer the prompts, e.g. for the release description.
+    """
+    command = [sys.executable, "-m", "changelogd", *args]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=str(cwd),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    assert process.stdin
+    process.stdin.write(stdin.encode())
+    process.stdin.close()
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = (
+            os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        )
+        # `ru_maxrss` is in kilobytes on Linux, but in bytes on macOS
+        divider = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return seconds, usage.ru_maxrss / divider, process.returncode
+    process.wait()
+    return time.perf_counter() - start, None, process.returncode
+
+
+def benchmark(
+    scale: int, format: str, types: int, workdir: Path
+) -> typing.Iterator[Measurement]:
+    template = workdir / f"{format}-{scale}"
+    generate(template, entries=scale, releases=scale, types=types, rst=format == "rst")
+
+    def measure(name: str, args: typing.List[str], cwd: Path) -> Measurement:
+        seconds, memory, exit_code = run(args, cwd)
+        return Measurement(name, scale, format, seconds, memory, exit_code)
+
+    yield measure("draft", ["draft"], template)
+    run(["partial"], template)
+    yield measure("partial --check", ["partial", "--check"], template)
+
+    # the commands below modify the directory, so they run on its copy
+    commands = [
+        ("entry", ["entry", "--type", "1", "--message", "Message", "--issue-id", "1"]),
+        ("release", ["release", release_version(scale)]),
+    ]
+    if scale >= 2:
+        # inserted before the newest release, with a sub-id of the preceding one
+        hotfix = release_version(scale - 2)[:-1] + "1"
+        commands.append(("release (hotfix)", ["release", hotfix]))
+    for name, args in commands:
+        copy = workdir / "copy"
+        shutil.copytree(template, copy)
+        yield measure(name, args, copy)
+        shutil.rmtree(copy)
+    shutil.rmtree(template)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        default="10,100,1000",
+        help="Comma-separated numbers of entries and releases (e.g. 10,1000,100000).",
+    )
+    parser.add_argument("--formats", default="md,rst")
+    parser.add_argument("--types", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Save the results into a JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'command':<18}{'scale':>8}{'format':>8}{'time':>12}{'peak memory':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in (int(scale) for scale in args.scales.split(",")):
+            for format in args.formats.split(","):
+                for result in benchmark(scale, format, args.types, Path(tmp_dir)):
+                    memory = (
+                        f"{result.peak_memory_mb:11.1f}MB"
+                        if result.peak_memory_mb is not None
+                        else f"{'-':>13}"
+                    )
+                    failed = (
+                        f" (exit code {result.exit_code})" if result.exit_code else ""
+                    )
+                    print(
+                        f"{result.command:<18}{result.scale:>8}{result.format:>8}"
+                        f"{result.seconds * 1000:10.1f}ms {memory}{failed}"
+                    )
+                    results.append(result._asdict())
+
+    if args.json:
+        with args.json.open("w") as json_fh:
+            json.dump(results, json_fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Generate a synthetic `changelog.d` directory for the benchmarks.
+
+Usage: python benchmarks/generator.py PATH [--entries 100] [--releases 100]
+       [--types 5] [--rst]
+"""
+
+import argparse
+import hashlib
+import subprocess
+import sys
+from pathlib import Path
+
+from changelogd.serializers import YamlSerializer
+
+# entries in each of the generated release files
+ENTRIES_PER_RELEASE = 5
+
+
+def _entry(number: int, type_: str) -> dict:
+    return {
+        "issue_id": [str(number)],
+        "message": f"Change number {number} of the {type_} type",
+        "os_user": "user",
+        "git_user": "Some User",
+        "git_email": "user@example.com",
+        "timestamp": 1580608922 + number,
+        "type": type_,
+    }
+
+
+def release_version(release_id: int) -> str:
+    return f"{release_id // 100}.{release_id % 100}.0"
+
+
+def generate(
+    path: Path, entries: int, releases: int, types: int = 5, rst: bool = False
+) -> Path:
+    """Initialize `changelogd` in the given directory, and create the entry and
+    release files. Returns the configuration directory."""
+    path.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, "-m", "changelogd", "init"]
+    if rst:
+        command.append("--rst")
+    subprocess.run(
+        command,
+        cwd=str(path),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    config_dir = path / "changelog.d"
+
+    # files are dumped with the fastest available backend
+    serializer = YamlSerializer("pyyaml")
+    config_path = config_dir / "config.yaml"
+    with config_path.open() as config_fh:
+        config = serializer.load(config_fh)
+    type_names = [f"type{number}" for number in range(types)]
+    config["message_types"] = [
+        {"name": name, "title": f"Changes of {name}"} for name in type_names
+    ]
+    with config_path.open("w") as config_fh:
+        serializer.dump(config, config_fh)
+
+    for number in range(entries):
+        entry = _entry(number, type_names[number % types])
+        digest = hashlib.md5(str(number).encode()).hexdigest()[:8]
+        entry_path = config_dir / f"{entry['type']}.{digest}.entry.yaml"
+        with entry_path.open("w") as entry_fh:
+            serializer.dump(entry, entry_fh)
+
+    releases_dir = config_dir / "releases"
+    releases_dir.mkdir(exist_ok=True)
+    for release_id in range(releases):
+        release_entries: dict = {}
+        for number in range(ENTRIES_PER_RELEASE):
+            type_ = type_names[number % types]
+            release_entries.setdefault(type_, []).append(
+                _entry(release_id * ENTRIES_PER_RELEASE + number, type_)
+            )
+        release = {
+            "entries": release_entries,
+            "release_date": "2020-02-02",
+            "release_description": f"Release {release_id}",
+            "release_version": release_version(release_id),
+        }
+        release_path = releases_dir / f"{release_id}.{release_version(release_id)}.yaml"
+        with release_path.open("w") as release_fh:
+            serializer.dump(release, release_fh)
+    return config_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--releases", type=int, default=100)
+    parser.add_argument("--types", type=int, default=5)
+    parser.add_argument("--rst", action="store_true", help="Use the RST templates.")
+    args = parser.parse_args()
+
+    config_dir = generate(args.path, args.entries, args.releases, args.types, args.rst)
+    print(
+        f"Generated {args.entries} entries and {args.releases} releases in {config_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare the speed of YAML backends on a large releases directory.
+
+Usage: python benchmarks/yaml_backends.py [--releases 500] [--entries 50]
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from changelogd.serializers import YAML_BACKENDS
+from changelogd.serializers import YamlSerializer
+
+
+def generate_releases(releases_dir: Path, releases: int, entries: int) -> None:
+    serializer = YamlSerializer("ruamel")
+    for release_id in range(releases):
+        release = {
+            "entries": {
+                type_: [
+                    {
+                        "issue_id": [str(release_id * entries + number)],
+                        "message": f"Change number {number} of the {type_} type",
+                        "os_user": "user",
+                        "git_user": "Some User",
+                        "git_email": "user@example.com",
+                        "timestamp": 1580608922 + number,
+                        "type": type_,
+                    }
+                    for number in range(entries // 5)
+                ]
+                for type_ in ("feature", "bug", "doc", "deprecation", "other")
+            },
+            "release_date": datetime.date(2020, 2, 2),
+            "release_description": f"Release {release_id}",
+            "release_version": f"1.{release_id}",
+        }
+        path = releases_dir / f"{release_id}.1.{release_id}.yaml"
+        with path.open("w") as release_fh:
+            serializer.dump(release, release_fh)
+
+
+def measure(releases_dir: Path, backend: str) -> float:
+    serializer = YamlSerializer(backend)
+    start = time.perf_counter()
+    for item in os.listdir(releases_dir):
+        with (releases_dir / item).open() as release_fh:
+            serializer.load(release_fh)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--releases", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        releases_dir = Path(tmp_dir)
+        generate_releases(releases_dir, args.releases, args.entries)
+        print(f"Loading {args.releases} releases with {args.entries} entries each:")
+        baseline = measure(releases_dir, "ruamel")
+        for backend in YAML_BACKENDS:
+            duration = (
+                baseline if backend == "ruamel" else measure(releases_dir, backend)
+            )
+            print(
+                f"  {backend:<8} {duration * 1000:9.1f}ms "
+                f"({baseline / duration:.1f}x speedup)"
+            )
+
+
+if __name__ == "__main__":
+    main()
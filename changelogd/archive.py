@@ -0,0 +1,93 @@
+"""Archive of old releases, packed into a single file."""
+
+import json
+import mmap
+import os
+import typing
+from pathlib import Path
+
+ARCHIVE_NAME = "archive.pack"
+ARCHIVE_VERSION = 1
+
+
+class ReleaseArchive:
+    """Read-only access to the releases packed into the archive file.
+
+    The archive starts with a JSON header line, which contains the index of
+    the releases, i.e. their metadata with an offset and length of the data.
+    The releases data, encoded as JSON, follows the header. The file is
+    memory-mapped, and only the requested releases are decoded.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as archive_fh:
+            self._mmap = mmap.mmap(archive_fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header_end = self._mmap.find(b"\n")
+            header = json.loads(self._mmap[:header_end])
+            if header.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"unsupported version: {header.get('version')}")
+            self._rows: typing.Dict[str, typing.Dict[str, typing.Any]] = {
+                row["name"]: row for row in header["releases"]
+            }
+        except (ValueError, KeyError, TypeError) as exc:
+            self.close()
+            raise ValueError(
+                f"The releases archive {path} is corrupted: {exc}"
+            ) from exc
+        self._data_offset = header_end + 1
+
+    @property
+    def rows(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Metadata of the archived releases, in the order they were written."""
+        return [self.get_row(name) for name in self._rows]
+
+    def get_row(self, name: str) -> typing.Dict[str, typing.Any]:
+        return {
+            key: value
+            for key, value in self._rows[name].items()
+            if key not in ("offset", "length")
+        }
+
+    def load(self, name: str) -> typing.Any:
+        return json.loads(self.load_raw(name))
+
+    def load_raw(self, name: str) -> bytes:
+        row = self._rows[name]
+        start = self._data_offset + row["offset"]
+        return self._mmap[start : start + row["length"]]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def write_archive(
+    path: Path,
+    releases: typing.Iterable[typing.Tuple[typing.Dict[str, typing.Any], bytes]],
+) -> None:
+    """Write the archive with given releases metadata and their encoded data.
+
+    The archive is written into a temporary file first, and replaced at once.
+    """
+    rows = []
+    offset = 0
+    chunks = []
+    for row, data in releases:
+        rows.append({**row, "offset": offset, "length": len(data)})
+        chunks.append(data)
+        offset += len(data) + 1
+
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("wb") as archive_fh:
+        header = {"version": ARCHIVE_VERSION, "releases": rows}
+        archive_fh.write(json.dumps(header, sort_keys=True).encode() + b"\n")
+        for chunk in chunks:
+            archive_fh.write(chunk + b"\n")
+    os.replace(temp_path.as_posix(), path.as_posix())
+
+
+def encode_release(release: typing.Any) -> bytes:
+    return json.dumps(release, sort_keys=True, ensure_ascii=False, default=str).encode(
+        "utf-8"
+    )
@@ -0,0 +1,274 @@
+"""Persistent caches stored within the configuration directory."""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import typing
+from pathlib import Path
+
+from . import __version__
+
+# the cached data depends on the code which produced it, so the caches written
+# by other changelogd versions are discarded
+CACHE_VERSION = f"1-{__version__}"
+
+
+def get_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def prepare_cache_dir(cache_dir: Path) -> None:
+    """Create the cache directory, and make sure that git will ignore it."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    gitignore = cache_dir / ".gitignore"
+    if not gitignore.is_file():
+        with gitignore.open("w") as gitignore_fh:
+            gitignore_fh.write("*\n")
+
+
+def is_json_compatible(data: typing.Any) -> bool:
+    """Check if the data will look exactly the same after a JSON round trip."""
+    try:
+        return bool(json.loads(json.dumps(data)) == data)
+    except (TypeError, ValueError):
+        return False
+
+
+class JsonCache:
+    """A JSON document kept in the cache directory.
+
+    Missing, corrupted or outdated documents are treated as empty, so the cache
+    can be removed at any time. If the cache directory is not configured,
+    nothing is read or written.
+    """
+
+    name: str = ""
+
+    def __init__(self, cache_dir: typing.Optional[Path]) -> None:
+        self._path = cache_dir / self.name if cache_dir else None
+        self._items: typing.Dict[str, typing.Any] = self._load()
+        self._dirty = False
+
+    def _load(self) -> typing.Dict[str, typing.Any]:
+        if self._path is None or not self._path.is_file():
+            return {}
+        try:
+            with self._path.open() as cache_fh:
+                data = json.load(cache_fh)
+        except (OSError, ValueError) as exc:
+            logging.info(f"Ignoring unreadable cache file {self._path}: {exc}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        items = data.get("items")
+        return items if isinstance(items, dict) else {}
+
+    def _prune(self) -> None:
+        """Hook for removing obsolete items before the cache is saved."""
+
+    def save(self) -> None:
+        if self._path is None or not self._dirty:
+            return
+        self._prune()
+        temp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        try:
+            prepare_cache_dir(self._path.parent)
+            with temp_path.open("w") as cache_fh:
+                json.dump({"version": CACHE_VERSION, "items": self._items}, cache_fh)
+            os.replace(temp_path.as_posix(), self._path.as_posix())
+        except OSError as exc:
+            logging.info(f"Cannot write cache file {self._path}: {exc}")
+            return
+        self._dirty = False
+
+
+class ReleaseCache(JsonCache):
+    """Parsed release files, keyed by their path.
+
+    An item is valid if the file size and modification time didn't change.
+    Otherwise, the file content hash is compared, which also allows to keep
+    the cached data for renamed files.
+    """
+
+    name = "releases.json"
+
+    def load(
+        self, path: Path, loader: typing.Callable[[str], typing.Any]
+    ) -> typing.Any:
+        key = path.as_posix()
+        stat = path.stat()
+        item = self._items.get(key)
+        if item and (item["size"], item["mtime"]) == (stat.st_size, stat.st_mtime_ns):
+            return copy.deepcopy(item["data"])
+
+        with path.open("rb") as release_fh:
+            content = release_fh.read()
+        digest = get_digest(content)
+        if not item or item["hash"] != digest:
+            item = next(
+                (item for item in self._items.values() if item["hash"] == digest), None
+            )
+        if item:
+            data = copy.deepcopy(item["data"])
+        else:
+            data = loader(content.decode("utf-8"))
+            if not is_json_compatible(data):
+                logging.debug(f"The data from {path} cannot be cached.")
+                return data
+
+        self._items[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+            "data": copy.deepcopy(data),
+        }
+        self._dirty = True
+        return data
+
+    def _prune(self) -> None:
+        self._items = {
+            key: item for key, item in self._items.items() if os.path.isfile(key)
+        }
+
+
+class RenderCache(JsonCache):
+    """Rendered release blocks, keyed by a digest of everything they depend on."""
+
+    name = "rendered.json"
+
+    def __init__(self, cache_dir: typing.Optional[Path]) -> None:
+        super().__init__(cache_dir)
+        self._used: typing.Set[str] = set()
+
+    def get(self, key: str) -> typing.Optional[str]:
+        value = self._items.get(key)
+        if value is not None:
+            self._used.add(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._items[key] = value
+        self._used.add(key)
+        self._dirty = True
+
+    def prune(self) -> None:
+        """Remove all items that were not used since the cache was loaded."""
+        if set(self._items) != self._used:
+            self._items = {
+                key: value for key, value in self._items.items() if key in self._used
+            }
+            self._dirty = True
+
+
+class TemplateReferences(JsonCache):
+    """Names of the templates referenced by a template, keyed by the digest of
+    its source, so only the changed templates have to be parsed again."""
+
+    name = "templates.json"
+
+    def __init__(self, cache_dir: typing.Optional[Path]) -> None:
+        super().__init__(cache_dir)
+        self._used: typing.Set[str] = set()
+
+    def get(self, digest: str) -> typing.Optional[typing.List[str]]:
+        references = self._items.get(digest)
+        if references is not None:
+            self._used.add(digest)
+        return references
+
+    def put(self, digest: str, references: typing.List[str]) -> None:
+        self._items[digest] = references
+        self._used.add(digest)
+        self._dirty = True
+
+    def _prune(self) -> None:
+        self._items = {
+            digest: references
+            for digest, references in self._items.items()
+            if digest in self._used
+        }
+
+
+class ReleaseManifest(JsonCache):
+    """Metadata of the release files, keyed by the file name.
+
+    A row is valid if the file size and modification time didn't change, so
+    the release files don't have to be parsed to find a particular release.
+    """
+
+    name = "manifest.json"
+
+    def get(self, path: Path) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        row = self._items.get(path.name)
+        if not row:
+            return None
+        stat = path.stat()
+        if (row["size"], row["mtime"]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return dict(row)
+
+    def put(self, path: Path, row: typing.Dict[str, typing.Any]) -> None:
+        stat = path.stat()
+        self._items[path.name] = {
+            **row,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+        self._dirty = True
+
+    def rename(self, old_path: Path, new_path: Path, release_id: str) -> None:
+        row = self._items.pop(old_path.name, None)
+        if row:
+            self._items[new_path.name] = {**row, "id": release_id}
+            self._dirty = True
+
+    def retain(self, names: typing.Iterable[str]) -> None:
+        """Remove rows of the files that are gone from the releases directory."""
+        names = set(names)
+        if set(self._items) - names:
+            self._items = {
+                name: row for name, row in self._items.items() if name in names
+            }
+            self._dirty = True
+
+
+class OutputDigests(JsonCache):
+    """Digests of the generated output files, keyed by their path.
+
+    A digest is valid if the file size and modification time didn't change, so
+    the output file doesn't have to be read to compare its content. The item
+    can also hold a fingerprint of the inputs the output was generated from.
+    """
+
+    name = "outputs.json"
+
+    def get(self, path: Path) -> typing.Optional[str]:
+        item = self._get_item(path)
+        return typing.cast(str, item["hash"]) if item else None
+
+    def get_inputs(self, path: Path) -> typing.Optional[str]:
+        item = self._get_item(path)
+        return item.get("inputs") if item else None
+
+    def put(self, path: Path, digest: str, inputs: typing.Optional[str] = None) -> None:
+        stat = path.stat()
+        item = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+            "inputs": inputs,
+        }
+        if self._items.get(path.as_posix()) != item:
+            self._items[path.as_posix()] = item
+            self._dirty = True
+
+    def _get_item(self, path: Path) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        item = self._items.get(path.as_posix())
+        if not item or not path.is_file():
+            return None
+        stat = path.stat()
+        if (item["size"], item["mtime"]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return typing.cast(typing.Dict[str, typing.Any], item)
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 """Main module."""
 
+import bisect
 import csv
 import datetime
+import functools
 import getpass
 import glob
 import hashlib
@@ -14,21 +16,51 @@ import re
 import sys
 import typing
 from collections import defaultdict
+from collections.abc import Mapping
+from copy import deepcopy
 from pathlib import Path
 
-from packaging.version import InvalidVersion
-from packaging.version import Version
-from ruamel.yaml import YAML  # type: ignore
-
+from . import __version__
+from .archive import ARCHIVE_NAME
+from .archive import encode_release
+from .archive import ReleaseArchive
+from .archive import write_archive
+from .cache import get_digest
+from .cache import OutputDigests
+from .cache import ReleaseCache
+from .cache import ReleaseManifest
 from .computed_values import ComputedValueProcessor
 from .config import Config
 from .config import DEFAULT_USER_DATA
-from changelogd.resolver import Resolver
-from changelogd.utils import add_to_git
+from .metrics import metrics
+from .serializers import JsonSerializer
+from .serializers import STORAGE_FORMATS
+from .serializers import YAML_BACKENDS
+from .serializers import YamlSerializer
+from changelogd.utils import GitStager
 from changelogd.utils import get_git_data
 
-yaml = YAML(typ="safe")
-yaml.default_flow_style = False
+if typing.TYPE_CHECKING:
+    from packaging.version import Version
+    from .resolver import Resolver
+
+yaml = YamlSerializer()
+json_serializer = JsonSerializer()
+
+# opened release archives, with the file signature at the time of opening
+_archives: typing.Dict[str, typing.Tuple[typing.Tuple[int, ...], ReleaseArchive]] = {}
+
+# entries attached to an existing release are appended at the end of its file
+APPENDED_ENTRIES_KEY = "appended_entries"
+
+# the output file is read in blocks of this number of characters
+FILE_BLOCK_SIZE = 2**16
+
+# the release file name starts with its id, e.g. `3.1.0.yaml` or `3-1.1.0.1.yaml`
+RELEASE_FILE_PATTERN = re.compile(r"(\d+(?:-\d+)*).*\.(ya?ml|json)")
+
+# position of a release, the ids are compared as tuples, i.e. `3` < `3-1` < `4`
+ReleaseId = typing.Tuple[int, ...]
 
 
 class EntryField:
@@ -52,6 +84,37 @@ class EntryField:
         self.required = bool(data.get("required", True))
         self.multiple = bool(data.get("multiple", False))
         self.default = data.get("default", None)
+        self.default_processor: typing.Optional[ComputedValueProcessor] = None
+        if isinstance(self.default, Mapping) and "compute" in self.default:
+            self.default_processor = ComputedValueProcessor.from_default(self.default)
+
+    def get_default(self) -> typing.Any:
+        if not self.default:
+            return None
+        if self.default_processor is not None:
+            return self.default_processor.get_value()
+        return self.default
+
+    def parse(self, value: typing.Any) -> typing.Any:
+        """Convert a value provided in a bulk entries file."""
+        if value in (None, "", []):
+            default = self.get_default()
+            value = default.strip() if default else None
+        if value is None:
+            if self.required:
+                raise ValueError(f"the '{self.name}' field is required")
+            return None
+        if not self.multiple:
+            return str(value)
+        if isinstance(value, list):
+            return [str(item).strip() for item in value]
+        return self._split(str(value))
+
+    @staticmethod
+    def _split(value: str) -> typing.List[str]:
+        csv_string = io.StringIO(value)
+        reader = csv.reader(csv_string, delimiter=",")
+        return [value.strip() for value in next(reader)]
 
     @property
     def value(self) -> typing.Any:
@@ -62,17 +125,7 @@ class EntryField:
                 modifiers.append("required")
             if self.multiple:
                 modifiers.append("separate multiple values with comma")
-            default: typing.Any
-            if self.default:
-                if isinstance(self.default, dict) and "compute" in self.default:
-                    processor = ComputedValueProcessor.from_string(
-                        self.default["compute"]
-                    )
-                    default = processor.function()
-                else:
-                    default = self.default
-            else:
-                default = None
+            default = self.get_default()
             aux = f" ({', '.join(modifiers)})" if modifiers else ""
             if default:
                 aux += f" [{default.strip()}]"
@@ -82,9 +135,7 @@ class EntryField:
             if value is None and not self.required:
                 break
         if value is not None and self.multiple:
-            csv_string = io.StringIO(value)
-            reader = csv.reader(csv_string, delimiter=",")
-            value = [value.strip() for value in next(reader)]
+            value = self._split(value)
         return value
 
 
@@ -100,61 +151,268 @@ def entry(
     config: Config,
     release: typing.Optional[str],
     options: typing.Dict[str, typing.Optional[str]],
+    source: typing.Optional[typing.IO[str]] = None,
 ) -> None:
-    data = config.get_data()
-    release_ = _get_release_entry(config, release)
+    """Create a changelog entry, or all entries from the source file if provided."""
+    data = config.data
+    _set_yaml_backend(config)
+    storage_format = _get_storage_format(config)
+    release_row = _get_release_entry(config, release)
     computed_value_processors = [
         ComputedValueProcessor(item) for item in data.get("computed_values", [])
     ]
     entry_fields = [EntryField(**entry) for entry in data.get("entry_fields", [])]
-    entry_type = _get_entry_type(data, options)
-
-    entry = {
-        entry_.name: options.get(entry_.name) or entry_.value for entry_ in entry_fields
-    }
-    entry["type"] = entry_type
+    # all computed values are evaluated concurrently, while waiting for the input
+    for processor in computed_value_processors:
+        processor.start()
+    for entry_field in entry_fields:
+        if entry_field.default_processor is not None:
+            entry_field.default_processor.start()
+
+    if source is not None:
+        entries = _read_bulk_entries(data, entry_fields, source)
+    else:
+        entry_type = _get_entry_type(data, options)
+        entry = {
+            entry_.name: options.get(entry_.name) or entry_.value
+            for entry_ in entry_fields
+        }
+        entry["type"] = entry_type
+        entries = [entry]
 
-    _add_user_data(entry, config.get_value("user_data", DEFAULT_USER_DATA))
+    # the user data and computed values are the same for all entries
+    common_data: typing.Dict[str, typing.Any] = {}
+    _add_user_data(common_data, config.get_value("user_data", DEFAULT_USER_DATA))
 
     if computed_value_processors:
         for processor in computed_value_processors:
-            entry.update(processor.get_data())
-
-    hash = hashlib.md5()
-    entries_flat = " ".join(f"{key}={value}" for key, value in entry.items())
-    hash.update(entries_flat.encode())
-
-    entry["timestamp"] = int(datetime.datetime.now().timestamp())
-    if release_:
-        output_file, release_data = release_
-        entries: typing.List[typing.Any] = release_data["entries"].get(entry_type, [])
-        entries.insert(0, entry)
-        release_data["entries"][entry_type] = entries
-        data = release_data
+            common_data.update(processor.get_data())
+
+    stager = GitStager()
+    output_files = []
+    for index, entry in enumerate(entries):
+        entry.update(common_data)
+        hash = hashlib.md5()
+        entries_flat = " ".join(f"{key}={value}" for key, value in entry.items())
+        if source is not None:
+            # identical records of the source file get distinct file names
+            entries_flat += f" record={index}"
+        hash.update(entries_flat.encode())
+
+        entry["timestamp"] = int(datetime.datetime.now().timestamp())
+        if not release_row:
+            output_file = config.path / (
+                f"{entry['type']}.{hash.hexdigest()[:8]}.entry.{storage_format}"
+            )
+            _dump_file(output_file, entry)
+            output_files.append(output_file)
+    if release_row:
+        output_files = [_append_release_entries(config, release_row, entries, stager)]
+    stager.add(*output_files)
+    staged = stager.stage()
+
+    if source is None:
+        logging.warning(f"Created changelog entry at {output_files[0].absolute()}")
+    elif release_row:
+        logging.warning(f"Added {len(entries)} entries to {output_files[0].absolute()}")
     else:
-        output_file = config.path / f"{entry_type}.{hash.hexdigest()[:8]}.entry.yaml"
-        data = entry
-    with output_file.open("w") as output_fh:
-        yaml.dump(data, output_fh)
-    add_to_git(output_file)
+        logging.warning(f"Created {len(entries)} changelog entries in {config.path}")
+    if not staged:
+        sys.exit(1)
+
+
+def _read_bulk_entries(
+    data: typing.Mapping[str, typing.Any],
+    entry_fields: typing.List[EntryField],
+    source: typing.IO[str],
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Read and validate all entries from a JSON Lines or CSV source.
 
-    logging.warning(f"Created changelog entry at {output_file.absolute()}")
+    Nothing is created if any of the records is invalid - all problems are
+    reported at once.
+    """
+    field_names = {field.name for field in entry_fields}
+    entries = []
+    errors = []
+    defaults: typing.Dict[str, typing.Any] = {}
+    for line, record in _read_records(source):
+        try:
+            unknown_fields = set(record) - field_names - {"type"}
+            if unknown_fields:
+                raise ValueError(f"unknown fields: {', '.join(sorted(unknown_fields))}")
+            if record.get("type") in (None, ""):
+                raise ValueError("the 'type' field is required")
+            try:
+                entry_type = _get_entry_type(data, {"type": str(record["type"])})
+            except SystemExit as exc:
+                raise ValueError(str(exc.code)) from exc
+            entry = {}
+            for field in entry_fields:
+                value = record.get(field.name)
+                if value in (None, "", []) and field.name in defaults:
+                    value = defaults[field.name]
+                elif value in (None, "", []):
+                    # computed defaults are evaluated only once
+                    value = defaults[field.name] = field.get_default()
+                entry[field.name] = field.parse(value)
+            entry["type"] = entry_type
+        except ValueError as exc:
+            errors.append(f"Line {line}: {exc}")
+            continue
+        entries.append(entry)
+
+    if errors:
+        sys.exit("Invalid entries:\n" + "\n".join(errors))
+    if not entries:
+        sys.exit("There are no entries in the provided file.")
+    return entries
+
+
+def _read_records(
+    source: typing.IO[str],
+) -> typing.Iterator[typing.Tuple[int, typing.Dict[str, typing.Any]]]:
+    """Read records from the JSON Lines or CSV source, with their line numbers.
+
+    The format is recognized by the file extension, or by the content if the
+    data is read from the standard input.
+    """
+    content = source.read()
+    name = str(getattr(source, "name", ""))
+    if name.endswith(".csv") or (
+        not name.endswith((".jsonl", ".json")) and not content.lstrip().startswith("{")
+    ):
+        reader = csv.DictReader(io.StringIO(content))
+        for row in reader:
+            yield reader.line_num, {
+                key: value for key, value in row.items() if value not in (None, "")
+            }
+        return
+
+    for line, record_line in enumerate(content.splitlines(), start=1):
+        if not record_line.strip():
+            continue
+        try:
+            record = json.loads(record_line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            sys.exit(f"Line {line}: each line has to contain a JSON object.")
+        yield line, record
+
+
+def _set_yaml_backend(config: Config) -> None:
+    backend = config.get_value("yaml_backend", "auto")
+    if backend not in YAML_BACKENDS:
+        sys.exit(
+            f"Unknown 'yaml_backend': '{backend}'. "
+            f"Available backends: {', '.join(YAML_BACKENDS)}"
+        )
+    yaml.backend = backend
+
+
+def _get_storage_format(config: Config) -> str:
+    storage_format = str(config.get_value("storage_format", "yaml"))
+    if storage_format not in STORAGE_FORMATS:
+        sys.exit(
+            f"Unknown 'storage_format': '{storage_format}'. "
+            f"Available formats: {', '.join(STORAGE_FORMATS)}"
+        )
+    return storage_format
+
+
+def _get_serializer(
+    path: typing.Union[Path, str],
+) -> typing.Union[YamlSerializer, JsonSerializer]:
+    """Get the serializer matching the file extension."""
+    return json_serializer if str(path).endswith(".json") else yaml
+
+
+def _dump_file(path: Path, data: typing.Any) -> None:
+    with path.open("w") as output_fh:
+        _get_serializer(path).dump(data, output_fh)
 
 
 def _get_release_entry(
     config: Config, release: typing.Optional[str]
-) -> typing.Optional[typing.Tuple[Path, typing.Dict[str, typing.Any]]]:
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
     if not release:
         return None
-    releases_files = [
-        item for item in config.releases_dir.iterdir() if item.suffix == ".yaml"
-    ]
-    for release_file in releases_files:
-        with release_file.open() as release_file_fh:
-            release_data = yaml.load(release_file_fh)
-        if release_data.get("release_version") == release:
-            return (release_file, release_data)
-    sys.exit(f"The release '{release}' doesn't exist.")
+    release_row = _find_release(_get_release_index(config), release)
+    if release_row is None:
+        sys.exit(f"The release '{release}' doesn't exist.")
+    return release_row
+
+
+def _append_release_entries(
+    config: Config,
+    release_row: typing.Dict[str, typing.Any],
+    new_entries: typing.List[dict],
+    stager: GitStager,
+) -> Path:
+    """Attach entries to the existing release without rewriting the release file.
+
+    The entries are appended to the block that closes the release file, they
+    are merged into the release entries when the file is loaded. If the
+    block doesn't exist yet, the release file is rewritten once to add it.
+    JSON release files cannot be appended to, so they are always rewritten.
+    Archived releases are extracted from the archive first.
+    """
+    path: Path = release_row["_path"]
+    if _is_archived(path):
+        path = _extract_archived_release(config, path, stager)
+    if path.suffix == ".json":
+        release_data = _load_release_file(path)
+        for entry in new_entries:
+            release_data["entries"].setdefault(entry["type"], []).insert(0, entry)
+        _dump_file(path, release_data)
+    else:
+        if _has_appended_entries(path):
+            content = ""
+        else:
+            _dump_file(path, _load_release_file(path))
+            content = f"{APPENDED_ENTRIES_KEY}:\n"
+        stream = io.StringIO()
+        yaml.dump(new_entries, stream)
+        with path.open("a") as release_fh:
+            release_fh.write(content + stream.getvalue())
+
+    row = {key: value for key, value in release_row.items() if key != "_path"}
+    entries = row["entries"] = dict(row["entries"])
+    for entry in new_entries:
+        entries[entry["type"]] = entries.get(entry["type"], 0) + 1
+    row["hash"] = get_digest(path.read_bytes())
+    manifest = ReleaseManifest(config.cache_dir)
+    manifest.put(path, row)
+    manifest.save()
+    return path
+
+
+def _has_appended_entries(path: Path) -> bool:
+    """Check if the last top-level key of the release file is the appended entries.
+
+    The file is read backwards, only until the last top-level key is found.
+    """
+    with path.open("rb") as release_fh:
+        position = release_fh.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            size = min(position, 2**12)
+            position -= size
+            release_fh.seek(position)
+            tail = release_fh.read(size) + tail
+            lines = tail.split(b"\n")
+            # the first line may be incomplete, unless the file start was reached
+            for line in reversed(lines if position == 0 else lines[1:]):
+                if line and line[:1] not in b" -#":
+                    return line.startswith(f"{APPENDED_ENTRIES_KEY}:".encode())
+    return False
+
+
+def _find_release(
+    index: typing.List[typing.Dict[str, typing.Any]], version: str
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Find the release index row with a given version."""
+    return next((row for row in index if row["release_version"] == version), None)
 
 
 def _add_user_data(
@@ -181,7 +439,7 @@ def _add_user_data(
 
 
 def _get_entry_type(
-    data: typing.Dict[str, typing.Any], options: typing.Dict[str, typing.Any]
+    data: typing.Mapping[str, typing.Any], options: typing.Dict[str, typing.Any]
 ) -> str:
     message_types = data.get("message_types", [])
     if not message_types:
@@ -225,25 +483,29 @@ def _get_entry_type(
 
 
 def _get_type_name(
-    message_types: typing.List[typing.Dict[str, str]],
+    message_types: typing.Sequence[typing.Mapping[str, str]],
     selection: typing.Union[int, str],
 ) -> str:
     return message_types[int(selection) - 1].get("name", "")
 
 
 def _is_in_range(
-    index: int, message_types: typing.List[typing.Dict[str, typing.Any]]
+    index: int, message_types: typing.Sequence[typing.Mapping[str, typing.Any]]
 ) -> bool:
     return 0 < int(index) < len(message_types) + 1
 
 
 def draft(config: Config, version: str) -> None:
+    from .resolver import Resolver
+
+    _set_yaml_backend(config)
     releases, _ = _read_input_files(config, version)
 
     resolver = Resolver(config)
-    draft = resolver.full_resolve(releases)
-
-    print(draft)
+    with metrics.phase("output_writing"):
+        for chunk in metrics.iterate("rendering", resolver.stream_resolve(releases)):
+            sys.stdout.write(chunk)
+        sys.stdout.write("\n")
 
 
 def release(
@@ -258,192 +520,919 @@ def release(
     elif not isinstance(config, Config):
         config = Config(config)
     config.settings["partial"] = partial
+    _set_yaml_backend(config)
+    # the release index is built only once per command
+    index: typing.Optional[ReleaseIndex] = None
     if version is None:
         version = config.partial_name
     else:
-        release_versions = {
-            item.stem[item.stem.find(".") + 1 :]
-            for item in config.releases_dir.iterdir()
-            if item.suffix == ".yaml"
-        }
-        if version in release_versions:
+        index = _get_release_index(config)
+        if _find_release(index, version) is not None:
             sys.exit(f"The release '{version}' already exists.")
 
-    releases, entries = _read_input_files(config, version, check)
+    output_path = Path(output) if output else config.output_path
+    inputs = None
+    if partial:
+        inputs = _get_input_fingerprint(config, output_path)
+        if check and _is_output_up_to_date(config, output_path, inputs):
+            logging.warning(f"Changelog file {output_path} is up to date")
+            return
+    new_release, entries = _create_new_release(config, version, check)
+
+    splice_marker = config.get_value("splice_marker")
+    if splice_marker:
+        if index is None:
+            index = _get_release_index(config)
+        chunks = _splice_release(
+            config, index, new_release, output_path, str(splice_marker)
+        )
+        if chunks is not None:
+            staged = _finish_release(config, index, [new_release], version, entries)
+            _write_output(output_path, chunks, check, config.cache_dir, inputs)
+            if not staged:
+                sys.exit(1)
+            return
+        logging.info("Cannot splice the release, regenerating the whole changelog.")
+
+    from .resolver import Resolver
+
+    cache = ReleaseCache(config.cache_dir)
+    releases = _prepare_releases(new_release, config.releases_dir, cache)
+    cache.save()
 
-    if not config.get_bool_setting("partial"):
-        _save_release_file(config, releases, version)
-        logging.info("Removing old entry files")
-        for entry in entries:
-            os.remove(entry)
+    staged = _finish_release(config, index, releases, version, entries)
 
     resolver = Resolver(config)
-    release = resolver.full_resolve(releases)
+    _write_output(
+        output_path, resolver.stream_resolve(releases), check, config.cache_dir, inputs
+    )
+    if not staged:
+        sys.exit(1)
 
-    output_path = Path(output) if output else config.output_path
 
-    if check:
-        with output_path.open("r") as output_fh:
-            previous_content = output_fh.read()
+def migrate(config: Config, storage_format: str) -> None:
+    """Convert the entry and release files into the given storage format."""
+    _set_yaml_backend(config)
+    paths = [Path(path) for path in _get_entry_paths(config)]
+    releases = [
+        path
+        for path in _discover_release_files(config.releases_dir).values()
+        if not _is_archived(path)
+    ]
+    stager = GitStager()
+    converted = 0
+    for path in paths + releases:
+        if path.suffix == f".{storage_format}":
+            continue
+        if path in releases:
+            data = _load_release_file(path)
+        else:
+            data = _load_entry_file(str(path))
+        new_path = path.with_suffix(f".{storage_format}")
+        _dump_file(new_path, data)
+        path.unlink()
+        stager.add(path, new_path)
+        logging.info(f"Converted {path.name} -> {new_path.name}")
+        converted += 1
+    staged = stager.stage()
+    logging.warning(f"Converted {converted} files into the {storage_format} format.")
+
+    if _get_storage_format(config) != storage_format:
+        logging.warning(
+            f"Set 'storage_format: {storage_format}' in the configuration file, "
+            f"to save new files in the {storage_format} format."
+        )
+    if not staged:
+        sys.exit(1)
+
+
+def compact(config: Config, keep: int, before: typing.Optional[str] = None) -> None:
+    """Pack the old release files into the releases archive.
+
+    Either the releases older than the `before` release are packed, or all
+    except the `keep` newest ones.
+    """
+    _set_yaml_backend(config)
+    index = _get_release_index(config)
+    if before is not None:
+        cutoff = next((row for row in index if row["release_version"] == before), None)
+        if cutoff is None:
+            sys.exit(f"The release '{before}' doesn't exist.")
+        to_pack = [row for row in index if row["id"] < cutoff["id"]]
+    else:
+        to_pack = index[: max(len(index) - keep, 0)]
+    new_rows = [row for row in to_pack if not _is_archived(row["_path"])]
+    if not new_rows:
+        logging.warning("There are no release files to compact.")
+        return
+
+    archive = _get_archive(config.releases_dir)
+    packed = []
+    if archive is not None:
+        packed = [(row, archive.load_raw(row["name"])) for row in archive.rows]
+    paths = []
+    for row in new_rows:
+        path = row.pop("_path")
+        data = encode_release(_load_release_file(path))
+        packed.append(
+            ({**row, "id": _format_release_id(row["id"]), "name": path.name}, data)
+        )
+        paths.append(path)
+    stager = GitStager()
+    packed.sort(
+        key=lambda item: typing.cast(ReleaseId, _get_release_id(item[0]["name"]))
+    )
+    _write_archive(config.releases_dir, packed, stager)
+
+    for path in paths:
+        os.remove(path)
+        stager.add(path)
+    staged = stager.stage()
+    logging.warning(
+        f"Packed {len(new_rows)} release files into "
+        f"{config.releases_dir / ARCHIVE_NAME}"
+    )
+    if not staged:
+        sys.exit(1)
+
 
-    with output_path.open("w") as output_fh:
-        output_fh.truncate(0)
-        output_fh.write(release)
-        logging.warning(f"Generated changelog file to {output_path}")
+def _finish_release(
+    config: Config,
+    index: typing.Optional["ReleaseIndex"],
+    releases: typing.List[typing.Dict[str, typing.Any]],
+    version: str,
+    entries: typing.List[str],
+) -> bool:
+    """Save the release file and remove entries, unless the release is partial.
+
+    All changes are staged in git at once. Returns False if they couldn't be
+    staged.
+    """
+    if config.get_bool_setting("partial"):
+        return True
+    stager = GitStager()
+    if index is None:
+        index = _get_release_index(config)
+    _save_release_file(config, index, releases, version, stager)
+    logging.info("Removing old entry files")
+    for entry in entries:
+        os.remove(entry)
+        stager.add(entry)
+    return stager.stage()
+
+
+@metrics.timed("output_writing")
+def _write_output(
+    output_path: Path,
+    chunks: typing.Iterable[str],
+    check: bool,
+    cache_dir: typing.Optional[Path] = None,
+    inputs: typing.Optional[str] = None,
+) -> None:
+    """Write chunks into the output file, unless its content didn't change.
 
-    if check and previous_content != release:
+    The chunks are written into a temporary file, which replaces the output
+    file at once. If the content is the same, the output file is left intact,
+    so its modification time doesn't change. Only the content digests are
+    compared, the digest of the previous content is kept in the cache
+    directory, so the output file doesn't need to be read.
+
+    With `check` enabled, exit with an error if the content has changed. The
+    `inputs` fingerprint is saved along with the digest, see `_get_input_fingerprint`.
+    """
+    # the file behind a symlink is replaced, not the symlink itself
+    output_path = Path(os.path.realpath(output_path))
+    digests = OutputDigests(cache_dir)
+    previous_digest = _get_output_digest(output_path, digests)
+
+    digest = hashlib.sha256()
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    try:
+        with temp_path.open("w") as output_fh:
+            for chunk in metrics.iterate("rendering", chunks):
+                output_fh.write(chunk)
+                digest.update(chunk.encode())
+        if digest.hexdigest() == previous_digest:
+            os.remove(temp_path)
+            logging.warning(f"Changelog file {output_path} is up to date")
+        else:
+            if previous_digest is not None:
+                os.chmod(temp_path, os.stat(output_path).st_mode & 0o7777)
+            os.replace(temp_path.as_posix(), output_path.as_posix())
+            logging.warning(f"Generated changelog file to {output_path}")
+    except BaseException:
+        if temp_path.exists():
+            os.remove(temp_path)
+        raise
+    digests.put(output_path, digest.hexdigest(), inputs)
+    digests.save()
+
+    if check and previous_digest != digest.hexdigest():
         logging.error("Output file content is different than before.")
         sys.exit(1)
 
 
-def _parse_version(version_str: str) -> typing.Optional[Version]:
-    """Parse a version string, returning a Version object or None if invalid."""
+def _get_input_fingerprint(config: Config, output_path: Path) -> str:
+    """Calculate a fingerprint of everything a partial release is generated from.
+
+    These are the names, sizes and modification times of the configuration
+    file, the entry files, the release files and all files in the templates
+    directory tree, so none of the files has to be read.
+    """
+    paths = [config.path / "config.yaml", *map(Path, _get_entry_paths(config))]
+    if config.releases_dir.is_dir():
+        paths.extend(
+            sorted(path for path in config.releases_dir.iterdir() if path.is_file())
+        )
+    # templates can include any file in the directory tree, as Jinja loads them
+    for directory, dir_names, file_names in os.walk(config.path / "templates"):
+        dir_names.sort()
+        file_paths = (Path(directory) / name for name in sorted(file_names))
+        paths.extend(path for path in file_paths if path.is_file())
+    files = []
+    for path in paths:
+        stat = path.stat()
+        files.append([path.as_posix(), stat.st_size, stat.st_mtime_ns])
+    data = {"version": __version__, "output": output_path.as_posix(), "files": files}
+    return get_digest(json.dumps(data).encode())
+
+
+def _is_output_up_to_date(config: Config, output_path: Path, inputs: str) -> bool:
+    """Check if the output file was generated from the same inputs, and it
+    wasn't modified since."""
+    output_path = Path(os.path.realpath(output_path))
+    return OutputDigests(config.cache_dir).get_inputs(output_path) == inputs
+
+
+def _get_output_digest(
+    output_path: Path, digests: OutputDigests
+) -> typing.Optional[str]:
+    """Get the digest of the output file content, None if it doesn't exist."""
+    if not output_path.is_file():
+        return None
+    digest = digests.get(output_path)
+    if digest is not None:
+        return digest
+    sha256 = hashlib.sha256()
+    with output_path.open("r") as output_fh:
+        for block in iter(functools.partial(output_fh.read, FILE_BLOCK_SIZE), ""):
+            sha256.update(block.encode())
+    return sha256.hexdigest()
+
+
+def _splice_release(
+    config: Config,
+    existing_releases: "ReleaseIndex",
+    new_release: typing.Dict[str, typing.Any],
+    output_path: Path,
+    marker: str,
+) -> typing.Optional[typing.Iterator[str]]:
+    """Render only the new release and splice it into the existing output file.
+
+    The new release is placed right after the marker, replacing everything
+    between the marker and the newest saved release - which is the previously
+    generated partial release. Only the newest release file is loaded, to find
+    its position within the output file. The text between the marker and the
+    releases, and between the releases, is taken from the main template.
+
+    The output file is never read into memory at once - the splice offsets are
+    found in a single pass, and the returned chunks are copied from the file in
+    blocks. Returns None if the output cannot be spliced and has to be
+    regenerated from scratch.
+    """
+    if not output_path.is_file():
+        return None
+    if not existing_releases:
+        return None
+    newest = existing_releases[-1]
+    if new_release and existing_releases.find_insertion_index(
+        new_release.get("release_version", "")
+    ) < len(existing_releases):
+        return None
+
+    # a single file is parsed faster than the whole releases cache is loaded
+    newest_release = _load_release_file(newest["_path"])
+    if not newest_release:
+        return None
+    _set_template_release_id(newest_release, newest["id"])
+    newest_release["previous_release"] = (
+        existing_releases[-2]["release_version"] if len(existing_releases) > 1 else None
+    )
+
+    if new_release:
+        new_release["previous_release"] = newest["release_version"]
+        to_resolve = [newest_release, deepcopy(new_release)]
+    else:
+        to_resolve = [newest_release]
+    from .resolver import Resolver
+
+    resolver = Resolver(config)
+    with metrics.phase("rendering"):
+        newest_block, *new_blocks = resolver.resolve_releases(to_resolve)
+        layout = _get_splice_layout(resolver, marker)
+    if layout is None:
+        return None
+    prefix, separator = layout
+
+    markers, newest_blocks = _find_in_file(output_path, [marker, newest_block])
+    if len(markers) != 1 or len(newest_blocks) != 1:
+        return None
+    releases_start = markers[0] + len(marker)
+    newest_start = newest_blocks[0]
+    if newest_start < releases_start + len(prefix):
+        return None
+    if _read_file_text(output_path, releases_start, len(prefix)) != prefix:
+        return None
+    releases_start += len(prefix)
+    replaced_length = newest_start - releases_start
+    if replaced_length and (
+        replaced_length < len(separator)
+        or _read_file_text(output_path, newest_start - len(separator), len(separator))
+        != separator
+    ):
+        return None
+    new_block = "".join(block + separator for block in new_blocks)
+    return _iter_spliced_output(output_path, releases_start, new_block, newest_start)
+
+
+def _iter_spliced_output(
+    output_path: Path, releases_start: int, new_block: str, newest_start: int
+) -> typing.Iterator[str]:
+    """Copy the output file with the text between the offsets replaced."""
+    yield from _iter_file_range(output_path, 0, releases_start)
+    yield new_block
+    yield from _iter_file_range(output_path, newest_start)
+
+
+def _iter_file_blocks(path: Path) -> typing.Iterator[str]:
+    with path.open() as file_fh:
+        yield from iter(functools.partial(file_fh.read, FILE_BLOCK_SIZE), "")
+
+
+def _iter_file_range(
+    path: Path, start: int, end: typing.Optional[int] = None
+) -> typing.Iterator[str]:
+    """Read the text between the character offsets (until the end of the file
+    if `end` is None) in blocks."""
+    position = 0
+    for block in _iter_file_blocks(path):
+        block_end = position + len(block)
+        if block_end > start:
+            yield block[
+                max(start - position, 0) : None if end is None else end - position
+            ]
+        position = block_end
+        if end is not None and position >= end:
+            break
+
+
+def _read_file_text(path: Path, start: int, length: int) -> str:
+    return "".join(_iter_file_range(path, start, start + length))
+
+
+def _find_in_file(path: Path, texts: typing.List[str]) -> typing.List[typing.List[int]]:
+    """Find the character offsets of the first two occurrences of each text.
+
+    The file is read in a single pass, only the last block, and the end of the
+    previous one are kept in memory.
+    """
+    found: typing.List[typing.List[int]] = [[] for _ in texts]
+    search_from = [0] * len(texts)
+    longest = max(len(text) for text in texts)
+    buffer = ""
+    offset = 0
+    for block in _iter_file_blocks(path):
+        buffer += block
+        for i, text in enumerate(texts):
+            while text and len(found[i]) < 2:
+                position = buffer.find(text, search_from[i] - offset)
+                if position == -1:
+                    break
+                found[i].append(offset + position)
+                search_from[i] = offset + position + len(text)
+        # the occurrences can span across the blocks
+        keep_from = max(len(buffer) - longest + 1, 0)
+        buffer = buffer[keep_from:]
+        offset += keep_from
+        search_from = [max(start, offset) for start in search_from]
+    return found
+
+
+def _get_splice_layout(
+    resolver: "Resolver", marker: str
+) -> typing.Optional[typing.Tuple[str, str]]:
+    """Find the text the main template puts between the marker and the first
+    release, and between two releases.
+
+    The main template is rendered with two placeholder releases. Returns None
+    if they don't follow the marker in order.
+    """
+    placeholders = [f"\0release-{i}\0" for i in range(2)]
+    layout = resolver.resolve_main(placeholders)
+    marker_start = layout.find(marker)
+    if marker_start == -1:
+        return None
+    marker_end = marker_start + len(marker)
+    first = layout.find(placeholders[0], marker_end)
+    second = layout.find(placeholders[1], first)
+    if first == -1 or second == -1:
+        return None
+    return layout[marker_end:first], layout[first + len(placeholders[0]) : second]
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_version(version_str: str) -> typing.Optional["Version"]:
+    """Parse a version string, returning a Version object or None if invalid.
+
+    The parsed versions are memoized, each version is parsed once per process.
+    """
+    from packaging.version import InvalidVersion
+    from packaging.version import Version
+
     try:
         return Version(version_str)
     except InvalidVersion:
         return None
 
 
+SortKey = typing.List[typing.Any]
+
+
+def _get_sort_key(version: "Version") -> SortKey:
+    """Get a JSON compatible key which compares like the version itself.
+
+    It follows the PEP 440 ordering of `packaging.version.Version`, with the
+    infinities replaced by leading numbers, so the parts of the same type are
+    compared. The key is kept in the release index, so the versions of the
+    existing releases don't have to be parsed again.
+    """
+    release = list(version.release)
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    if version.pre is not None:
+        letter, number = version.pre
+        pre = [1, ("a", "b", "rc").index(letter), number]
+    elif version.post is None and version.dev is not None:
+        pre = [0]
+    else:
+        pre = [2]
+    post = [0] if version.post is None else [1, version.post]
+    dev = [1] if version.dev is None else [0, version.dev]
+    local: SortKey = [0]
+    if version.local is not None:
+        local = [
+            1,
+            [
+                [1, int(part)] if part.isdigit() else [0, part]
+                for part in version.local.split(".")
+            ],
+        ]
+    return [version.epoch, release, pre, post, dev, local]
+
+
+def _get_release_sort_key(
+    release: typing.Dict[str, typing.Any],
+) -> typing.Optional[SortKey]:
+    sort_key = release.get("sort_key")
+    if isinstance(sort_key, list):
+        return sort_key
+    parsed = _parse_version(str(release.get("release_version") or ""))
+    return _get_sort_key(parsed) if parsed is not None else None
+
+
+class _VersionOrder:
+    """Positions of the releases (sorted oldest-first by id) ordered by version,
+    to find the insertion point of a new version with a binary search.
+
+    The existing versions don't have to be sorted, the running maximum of their
+    versions is kept - the insertion point is the first release with a greater
+    version. The releases with unparseable versions are skipped. The `sort_key`
+    of the release index rows is used, if available, so only the releases
+    without it are parsed.
+    """
+
+    def __init__(self, releases: typing.List[typing.Dict[str, typing.Any]]) -> None:
+        self._length = len(releases)
+        self._maximums: typing.List[SortKey] = []
+        self._indexes: typing.List[int] = []
+        for i, rel in enumerate(releases):
+            sort_key = _get_release_sort_key(rel)
+            if sort_key is None:
+                continue
+            if not self._maximums or self._maximums[-1] < sort_key:
+                self._maximums.append(sort_key)
+                self._indexes.append(i)
+
+    def find_insertion_index(self, new_version: str) -> int:
+        parsed_new = _parse_version(new_version)
+        if parsed_new is None:
+            return self._length
+        position = bisect.bisect_right(self._maximums, _get_sort_key(parsed_new))
+        if position == len(self._maximums):
+            return self._length
+        return self._indexes[position]
+
+
+class ReleaseIndex(typing.List[typing.Dict[str, typing.Any]]):
+    """Metadata of the releases sorted by id (ascending).
+
+    The version order is built once, at the first insertion point lookup.
+    """
+
+    _version_order: typing.Optional[_VersionOrder] = None
+
+    def find_insertion_index(self, new_version: str) -> int:
+        if self._version_order is None:
+            self._version_order = _VersionOrder(self)
+        return self._version_order.find_insertion_index(new_version)
+
+
 def _find_insertion_index(
     existing_releases: typing.List[typing.Dict[str, typing.Any]], new_version: str
 ) -> int:
     """Find the index at which a new version should be inserted.
 
     Returns the index in the existing_releases list (sorted oldest-first by id)
-    where the new release should be placed. If the version cannot be parsed,
-    or is newer than all existing releases, returns len(existing_releases)
-    (i.e. append at the end).
+    where the new release should be placed, i.e. the index of the first
+    release with a greater version. If the version cannot be parsed, or is
+    newer than all existing releases, returns len(existing_releases)
+    (i.e. append at the end). Use `ReleaseIndex.find_insertion_index` for
+    the repeated lookups.
     """
-    parsed_new = _parse_version(new_version)
-    if parsed_new is None:
-        return len(existing_releases)
+    return _VersionOrder(existing_releases).find_insertion_index(new_version)
+
 
-    for i, rel in enumerate(existing_releases):
-        parsed_existing = _parse_version(rel.get("release_version", ""))
-        if parsed_existing is not None and parsed_new < parsed_existing:
-            return i
+def _get_release_id(name: str) -> typing.Optional[ReleaseId]:
+    match = RELEASE_FILE_PATTERN.match(name)
+    if not match:
+        return None
+    return tuple(int(part) for part in match.group(1).split("-"))
 
-    return len(existing_releases)
+
+def _format_release_id(release_id: ReleaseId) -> str:
+    return "-".join(str(part) for part in release_id)
+
+
+def _set_template_release_id(
+    release: typing.Dict[str, typing.Any], release_id: ReleaseId
+) -> None:
+    """Set the id variables of the release template.
+
+    The `id` stays an integer for the plain ids, only the sub-ids of the
+    inserted releases (e.g. `3-1`) are strings. The `release_id` is always
+    the string used in the file name.
+    """
+    release["id"] = (
+        release_id[0] if len(release_id) == 1 else _format_release_id(release_id)
+    )
+    release["release_id"] = _format_release_id(release_id)
+
+
+def _get_id_between(
+    lower: typing.Optional[ReleaseId], upper: typing.Optional[ReleaseId]
+) -> typing.Optional[ReleaseId]:
+    """Find an unused id that is ordered between the given ones.
+
+    The new releases get the next top-level id, the releases inserted between
+    the existing ones get a sub-id, e.g. `3-1` between `3` and `4`, so the
+    existing files don't need to be renamed. Returns None if there is no id
+    between the given ones, which is only the case for an insertion before
+    the `0` id (or manually named files, e.g. `3` and `3-0`).
+    """
+    if upper is None:
+        return (lower[0] + 1,) if lower is not None else (0,)
+    if lower is None:
+        if len(upper) > 1:
+            return upper[:-1]
+        return (upper[0] - 1,) if upper[0] > 0 else None
+    while True:
+        candidate = lower[:-1] + (lower[-1] + 1,)
+        if candidate < upper:
+            return candidate
+        candidate = lower + (1,)
+        if candidate < upper:
+            return candidate
+        lower = lower + (0,)
+        if lower >= upper:
+            return None
+
+
+def _get_insertion_id(
+    existing_releases: typing.List[typing.Dict[str, typing.Any]], insertion_index: int
+) -> typing.Optional[ReleaseId]:
+    """Get the id of a release inserted at the index of the existing releases."""
+    lower = existing_releases[insertion_index - 1]["id"] if insertion_index else None
+    upper = (
+        existing_releases[insertion_index]["id"]
+        if insertion_index < len(existing_releases)
+        else None
+    )
+    return _get_id_between(lower, upper)
 
 
 def _renumber_release_files(
     releases_dir: Path,
     existing_releases: typing.List[typing.Dict[str, typing.Any]],
     insertion_index: int,
+    manifest: typing.Optional[ReleaseManifest] = None,
+    stager: typing.Optional[GitStager] = None,
 ) -> None:
     """Renumber release files starting at insertion_index to make room.
 
-    All release files with id >= insertion_index are renamed so their id
-    is incremented by 1.
+    The top-level id of all releases starting at insertion_index is incremented
+    by 1. This is required only if there is no free id for the inserted
+    release, see `_get_id_between`. The manifest rows are moved along with the
+    files, and both old and new paths are collected by the stager.
     """
     # Process in reverse order to avoid naming conflicts
-    releases_to_renumber = [
-        rel for rel in existing_releases if rel["id"] >= insertion_index
-    ]
+    releases_to_renumber = existing_releases[insertion_index:]
+    archived: typing.Dict[str, typing.Tuple[str, str]] = {}
     for rel in reversed(releases_to_renumber):
         old_id = rel["id"]
-        new_id = old_id + 1
+        new_id = (old_id[0] + 1,) + old_id[1:]
         old_path = rel["_path"]
-        # Build new filename: replace the leading integer prefix
+        # Build new filename: replace the leading id prefix
         old_name = old_path.name
-        new_name = str(new_id) + old_name[len(str(old_id)) :]
-        new_path = releases_dir / new_name
-        old_path.rename(new_path)
+        match = typing.cast(typing.Match[str], RELEASE_FILE_PATTERN.match(old_name))
+        new_name = _format_release_id(new_id) + old_name[match.end(1) :]
+        new_path = old_path.parent / new_name
+        if _is_archived(old_path):
+            archived[old_name] = (_format_release_id(new_id), new_name)
+        else:
+            old_path.rename(new_path)
+            if manifest is not None:
+                manifest.rename(old_path, new_path, _format_release_id(new_id))
+            if stager is not None:
+                stager.add(old_path, new_path)
         rel["id"] = new_id
         rel["_path"] = new_path
         logging.info(f"Renumbered release file {old_name} -> {new_name}")
 
+    archive = _get_archive(releases_dir)
+    if archived and archive is not None:
+        # the archive is rewritten at once, with the renumbered releases
+        packed = []
+        for row in archive.rows:
+            data = archive.load_raw(row["name"])
+            if row["name"] in archived:
+                row["id"], row["name"] = archived[row["name"]]
+            packed.append((row, data))
+        _write_archive(releases_dir, packed, stager)
 
-def _discover_release_files(releases_dir: Path) -> typing.Dict[int, Path]:
-    """Discover release YAML files in releases_dir and return a mapping of id -> path.
 
-    Exits with an error if duplicate integer ids are found.
+def _discover_release_files(releases_dir: Path) -> typing.Dict[ReleaseId, Path]:
+    """Discover release files in releases_dir and return a mapping of id -> path.
+
+    Exits with an error if duplicate ids are found.
     """
-    versions: typing.Dict[int, Path] = dict()
+    versions: typing.Dict[ReleaseId, Path] = dict()
+
+    def add(path: Path) -> None:
+        version = _get_release_id(path.name)
+        if version is None:
+            return
+        if version in versions:
+            sys.exit(f"The version {_format_release_id(version)} is duplicated.")
+        versions[version] = path
+
     for item in os.listdir(releases_dir.as_posix()):
-        match = re.match(r"(\d+).*\.ya?ml", item)
+        match = RELEASE_FILE_PATTERN.match(item)
         if match:
-            version = int(match.group(1))
-            if version in versions:
-                sys.exit(f"The version {version} is duplicated.")
-            versions[version] = releases_dir / match.group(0)
+            add(releases_dir / match.group(0))
+
+    archive = _get_archive(releases_dir)
+    if archive is not None:
+        # the archive rows may hold integer ids of the previous versions,
+        # the ids are always taken from the names
+        for row in archive.rows:
+            add(archive.path / row["name"])
     return versions
 
 
-def _get_existing_releases_sorted(
+def _is_archived(path: Path) -> bool:
+    return path.parent.name == ARCHIVE_NAME
+
+
+def _get_archive(releases_dir: Path) -> typing.Optional[ReleaseArchive]:
+    """Get the releases archive, it is opened again only if the file has changed."""
+    path = releases_dir / ARCHIVE_NAME
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _close_archive(path)
+        return None
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    opened = _archives.get(path.as_posix())
+    if opened and opened[0] == signature:
+        return opened[1]
+    _close_archive(path)
+    try:
+        archive = ReleaseArchive(path)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    _archives[path.as_posix()] = (signature, archive)
+    return archive
+
+
+def _close_archive(path: Path) -> None:
+    opened = _archives.pop(path.as_posix(), None)
+    if opened:
+        opened[1].close()
+
+
+def _write_archive(
     releases_dir: Path,
-) -> typing.List[typing.Dict[str, typing.Any]]:
-    """Read all existing release files and return them sorted by id (ascending)."""
-    versions = _discover_release_files(releases_dir)
-    releases = []
+    packed: typing.List[typing.Tuple[typing.Dict[str, typing.Any], bytes]],
+    stager: typing.Optional[GitStager] = None,
+) -> None:
+    """Replace the releases archive content, remove it if there are no releases."""
+    path = releases_dir / ARCHIVE_NAME
+    _close_archive(path)
+    if packed:
+        write_archive(path, packed)
+    else:
+        os.remove(path)
+    if stager is not None:
+        stager.add(path)
+
+
+def _extract_archived_release(config: Config, path: Path, stager: GitStager) -> Path:
+    """Move the release from the archive into an individual release file."""
+    archive = typing.cast(ReleaseArchive, _get_archive(config.releases_dir))
+    release_path = (
+        config.releases_dir / f"{Path(path.name).stem}.{_get_storage_format(config)}"
+    )
+    _dump_file(release_path, archive.load(path.name))
+    _write_archive(
+        config.releases_dir,
+        [
+            (row, archive.load_raw(row["name"]))
+            for row in archive.rows
+            if row["name"] != path.name
+        ],
+        stager,
+    )
+    stager.add(release_path)
+    logging.info(f"Extracted {path.name} from the releases archive")
+    return release_path
+
+
+def _load_release_file(
+    path: Path, cache: typing.Optional[ReleaseCache] = None
+) -> typing.Any:
+    """Load a release file, use the cached data if the file didn't change."""
+    if _is_archived(path):
+        archive = typing.cast(ReleaseArchive, _get_archive(path.parent.parent))
+        return archive.load(path.name)
+    parse = functools.partial(_parse_release, serializer=_get_serializer(path))
+    if cache is None:
+        with path.open() as release_fh:
+            return parse(release_fh)
+    return cache.load(path, parse)
+
+
+def _parse_release(
+    stream: typing.Union[str, typing.IO[str]],
+    serializer: typing.Union[YamlSerializer, JsonSerializer],
+) -> typing.Any:
+    """Parse the release data and merge the appended entries into it."""
+    release = serializer.load(stream)
+    if not isinstance(release, dict):
+        return release
+    for entry in release.pop(APPENDED_ENTRIES_KEY, None) or []:
+        entries = release.setdefault("entries", {})
+        entries.setdefault(entry.get("type"), []).insert(0, entry)
+    return release
+
+
+@metrics.timed("release_parsing")
+def _get_release_index(config: Config) -> ReleaseIndex:
+    """Get metadata of the releases sorted by id (ascending).
+
+    The metadata is kept in the release manifest, which is validated against
+    the releases directory listing - only new or modified release files are
+    parsed. Corrupted release files are skipped.
+    """
+    versions = _discover_release_files(config.releases_dir)
+    manifest = ReleaseManifest(config.cache_dir)
+    # the parsed releases are loaded only if any release file has to be parsed
+    cache: typing.Optional[ReleaseCache] = None
+    index = ReleaseIndex()
     for vid in sorted(versions.keys()):
-        with versions[vid].open() as fh:
-            release_item = yaml.load(fh)
-            if not release_item:
-                continue
-            release_item["id"] = vid
-            release_item["_path"] = versions[vid]
-            releases.append(release_item)
-    return releases
+        path = versions[vid]
+        if _is_archived(path):
+            archive = typing.cast(ReleaseArchive, _get_archive(config.releases_dir))
+            index.append({**archive.get_row(path.name), "id": vid, "_path": path})
+            continue
+        row = manifest.get(path)
+        if row is None:
+            if cache is None:
+                cache = ReleaseCache(config.cache_dir)
+            row = _get_manifest_row(vid, path, _load_release_file(path, cache))
+            manifest.put(path, row)
+        if row["release_version"] is not None:
+            index.append({**row, "id": vid, "_path": path})
+    manifest.retain(path.name for path in versions.values() if not _is_archived(path))
+    manifest.save()
+    if cache is not None:
+        cache.save()
+    return index
+
+
+def _get_manifest_row(
+    release_id: ReleaseId, path: Path, release: typing.Any
+) -> typing.Dict[str, typing.Any]:
+    if not release:
+        release = {}
+    version = release.get("release_version")
+    if version is not None:
+        version = str(version)
+    parsed_version = _parse_version(version) if version is not None else None
+    return {
+        "id": _format_release_id(release_id),
+        "release_version": version,
+        "sort_key": (
+            _get_sort_key(parsed_version) if parsed_version is not None else None
+        ),
+        "hash": get_digest(path.read_bytes()),
+        "entries": {
+            name: len(entries) for name, entries in release.get("entries", {}).items()
+        },
+    }
 
 
 def _save_release_file(
-    config: Config, releases: typing.List[typing.Dict[str, typing.Any]], version: str
+    config: Config,
+    existing_releases: ReleaseIndex,
+    releases: typing.List[typing.Dict[str, typing.Any]],
+    version: str,
+    stager: GitStager,
 ) -> None:
     # Find the release matching the version being saved (releases are newest-first)
     current_release = next(
         rel for rel in releases if rel.get("release_version") == version
     )
 
-    # Read existing releases sorted by id (oldest first)
-    existing_releases = _get_existing_releases_sorted(config.releases_dir)
-
-    if not existing_releases:
-        release_id = 0
-    else:
-        insertion_index = _find_insertion_index(existing_releases, version)
-
-        if insertion_index < len(existing_releases):
-            # Inserting between existing releases - renumber subsequent files
-            _renumber_release_files(
-                config.releases_dir, existing_releases, insertion_index
-            )
-            release_id = insertion_index
-        else:
-            # Appending at the end (normal case)
-            release_id = existing_releases[-1]["id"] + 1
+    # existing releases are sorted by id (oldest first)
+    manifest = ReleaseManifest(config.cache_dir)
+
+    insertion_index = existing_releases.find_insertion_index(version)
+    release_id = _get_insertion_id(existing_releases, insertion_index)
+    if release_id is None:
+        # there is no free id - renumber subsequent files
+        _renumber_release_files(
+            config.releases_dir,
+            existing_releases,
+            insertion_index,
+            manifest,
+            stager,
+        )
+        release_id = _get_insertion_id(existing_releases, insertion_index)
+        assert release_id is not None
 
-    output_release_path = config.releases_dir / f"{release_id}.{version}.yaml"
-    with output_release_path.open("w") as output_release_fh:
-        yaml.dump(current_release, output_release_fh)
-        logging.warning(f"Saved new release data into {output_release_path}")
-    add_to_git(output_release_path)
+    storage_format = _get_storage_format(config)
+    output_release_path = (
+        config.releases_dir
+        / f"{_format_release_id(release_id)}.{version}.{storage_format}"
+    )
+    _dump_file(output_release_path, current_release)
+    logging.warning(f"Saved new release data into {output_release_path}")
+    manifest.put(
+        output_release_path,
+        _get_manifest_row(release_id, output_release_path, current_release),
+    )
+    manifest.save()
+    stager.add(output_release_path)
 
 
 def _read_input_files(
     config: Config, version: str, is_checking: bool = False
 ) -> typing.Tuple[typing.List[typing.Dict[str, typing.Any]], typing.List[str]]:
     release, entries = _create_new_release(config, version, is_checking)
-    releases = _prepare_releases(release, config.releases_dir)
+    cache = ReleaseCache(config.cache_dir)
+    releases = _prepare_releases(release, config.releases_dir, cache)
+    cache.save()
 
     return releases, entries
 
 
+@metrics.timed("release_parsing")
 def _prepare_releases(
-    release: typing.Dict, releases_dir: Path
+    release: typing.Dict,
+    releases_dir: Path,
+    cache: typing.Optional[ReleaseCache] = None,
 ) -> typing.List[typing.Dict]:
     versions = _discover_release_files(releases_dir)
     releases = []
     for version in sorted(versions.keys()):
-        with versions[version].open() as release_fh:
-            release_item = yaml.load(release_fh)
-            if not release_item:
-                logging.error(
-                    f"Release file {versions[version]} is corrupted and will be ignored."
-                )
-                continue
-            release_item["id"] = version
-            releases.append(release_item)
+        release_item = _load_release_file(versions[version], cache)
+        if not release_item:
+            logging.error(
+                f"Release file {versions[version]} is corrupted and will be ignored."
+            )
+            continue
+        _set_template_release_id(release_item, version)
+        releases.append(release_item)
     if release:
         # Find the correct insertion point for the new release using version comparison
         insertion_index = _find_insertion_index(
@@ -466,7 +1455,7 @@ def _create_new_release(
 ) -> typing.Tuple[typing.Dict[str, typing.Any], typing.List[str]]:
     empty = config.get_bool_setting("empty")
     partial = config.get_bool_setting("partial")
-    entries = glob.glob(str(config.path.absolute() / "*.entry.yaml"))
+    entries = _get_entry_paths(config)
     if not entries and not partial and not empty:
         logging.error("Cannot create new release without any entries.")
         sys.exit(1)
@@ -482,7 +1471,7 @@ def _create_new_release(
         ),
     }
 
-    _grab_entries(entries, release)
+    _grab_entries(entries, release, config.settings.get("jobs", 1))
 
     for group_name, items in release["entries"].items():
         release["entries"][group_name] = list(_sort_entries(items))
@@ -494,17 +1483,52 @@ def _create_new_release(
     return release, entries
 
 
+@metrics.timed("entry_parsing")
 def _grab_entries(
-    entries: typing.List[str], release: typing.Dict[str, typing.Any]
+    entries: typing.List[str], release: typing.Dict[str, typing.Any], jobs: int = 1
 ) -> None:
-    for entry_path in entries:
-        with open(entry_path) as entry_file:
-            entry_data = yaml.load(entry_file)
+    for entry_path, entry_data in zip(entries, _load_entry_files(entries, jobs)):
         timestamp = entry_data.get("timestamp") or os.path.getmtime(entry_path)
         entry_data["timestamp"] = timestamp
         release["entries"][entry_data.pop("type")].append(entry_data)
 
 
+def _load_entry_files(entries: typing.List[str], jobs: int) -> typing.Iterable:
+    """Load entry files, in parallel processes if more than one job is requested.
+
+    The results are always in the same order as the input paths. Zero jobs
+    means as many as the available CPUs.
+    """
+    if jobs == 1 or len(entries) < 2:
+        return map(_load_entry_file, entries)
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(entries) // (workers * 4))
+    # the spawned workers don't inherit the configured YAML backend
+    load = functools.partial(_load_entry_file, yaml_backend=yaml.backend)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(load, entries, chunksize=chunksize))
+
+
+@metrics.timed("entry_discovery")
+def _get_entry_paths(config: Config) -> typing.List[str]:
+    return sorted(
+        path
+        for storage_format in STORAGE_FORMATS
+        for path in glob.glob(str(config.path.absolute() / f"*.entry.{storage_format}"))
+    )
+
+
+def _load_entry_file(
+    entry_path: str, yaml_backend: typing.Optional[str] = None
+) -> typing.Any:
+    if yaml_backend is not None:
+        yaml.backend = yaml_backend
+    with open(entry_path) as entry_file:
+        return _get_serializer(entry_path).load(entry_file)
+
+
 def _sort_entries(items: typing.List[typing.Dict]) -> typing.Iterator[typing.Dict]:
     return reversed(sorted(items, key=lambda x: (x["timestamp"])))  # type: ignore
 
@@ -1,12 +1,19 @@
+import functools
+import sys
 import typing
 
 import click
 
-from . import changelogd
 from .config import Config
+from .serializers import STORAGE_FORMATS
 
+# number of functions shown in the profile summary
+PROFILE_SUMMARY_SIZE = 15
 
-def command_decorator(func: typing.Callable) -> click.core.Command:
+
+def command_decorator(
+    func: typing.Callable, cls: typing.Type[click.Command] = click.Command
+) -> click.Command:
     pass_state = click.make_pass_decorator(Config, ensure=True)
     verbose = click.option(
         *("-v", "--verbose"),
@@ -14,26 +21,138 @@ def command_decorator(func: typing.Callable) -> click.core.Command:
         help="Increase verbosity.",
         callback=Config.set_verbosity,  # type: ignore
     )
-    return click.command()(verbose(pass_state(click.pass_context(func))))
+    profile = click.option(
+        "--profile",
+        type=click.Path(dir_okay=False),
+        metavar="PATH",
+        help="Save the cProfile statistics into a file.",
+    )
+    metrics_json = click.option(
+        "--metrics-json",
+        type=click.Path(dir_okay=False),
+        metavar="PATH",
+        help="Save the phase timings and I/O counters as JSON.",
+    )
+    callback = measured(profiled(pass_state(click.pass_context(func))))
+    return click.command(cls=cls)(verbose(profile(metrics_json(callback))))
+
+
+def profiled(func: typing.Callable) -> typing.Callable:
+    """Run the command with cProfile if the `--profile` path is provided.
+
+    The statistics are saved even if the command fails, and the functions with
+    the highest cumulative time are printed to stderr.
+    """
+
+    @functools.wraps(func)
+    def wrapper(
+        *args: typing.Any, profile: typing.Optional[str] = None, **kwargs: typing.Any
+    ) -> typing.Any:
+        if profile is None:
+            return func(*args, **kwargs)
+
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            profiler.dump_stats(profile)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative")
+            stats.print_stats(PROFILE_SUMMARY_SIZE)
+            sys.stderr.write(f"Profile saved to {profile}\n")
+
+    return wrapper
+
+
+def measured(func: typing.Callable) -> typing.Callable:
+    """Save the metrics of the command if the `--metrics-json` path is provided.
+
+    The metrics are saved even if the command fails, with its exit code.
+    """
+
+    @functools.wraps(func)
+    def wrapper(
+        *args: typing.Any,
+        metrics_json: typing.Optional[str] = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        if metrics_json is None:
+            return func(*args, **kwargs)
 
+        from .metrics import metrics
 
-def dynamic_options(func: typing.Callable) -> typing.Callable:
-    output = click.option("--type", help="Message type (as number or string).")(func)
-    try:
-        entry_fields = Config().get_value("entry_fields")
-    except SystemExit:
-        return output
-    for entry_field in entry_fields:
-        name = entry_field.get("name").replace("_", "-")
-        if not name or " " in name:
-            continue
-        kwargs = dict()
-        verbose_name = entry_field.get("verbose_name")
-        if verbose_name:
-            kwargs["help"] = verbose_name
+        command = click.get_current_context().info_name
+        exit_code: typing.Any = 0
+        metrics.enable()
+        try:
+            return func(*args, **kwargs)
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+            raise
+        except BaseException:
+            exit_code = 1
+            raise
+        finally:
+            metrics.disable()
+            metrics.save(metrics_json, command=command, exit_code=exit_code)
 
-        output = click.option(f"--{name}", **kwargs)(output)
-    return output
+    return wrapper
+
+
+def jobs_option(func: typing.Callable) -> typing.Callable:
+    return click.option(
+        *("-j", "--jobs"),
+        type=click.IntRange(min=0),
+        default=1,
+        show_default=True,
+        help="Number of processes used to parse entry files (0 - one per CPU).",
+    )(func)
+
+
+class EntryCommand(click.Command):
+    """Command with additional options generated from the `entry_fields`.
+
+    The configuration is loaded only when the command is actually used, and
+    the same `Config` instance is passed later to the command callback.
+    """
+
+    def get_params(self, ctx: click.Context) -> typing.List[click.Parameter]:
+        params = super().get_params(ctx)
+        options: typing.Optional[typing.List[click.Parameter]]
+        options = ctx.meta.get("entry_field_options")
+        if options is None:
+            options = self._get_entry_field_options(ctx.ensure_object(Config))
+            ctx.meta["entry_field_options"] = options
+        position = next(
+            (i for i, param in enumerate(params) if param.name == "type"), 0
+        )
+        return params[:position] + options + params[position:]
+
+    @staticmethod
+    def _get_entry_field_options(config: Config) -> typing.List[click.Parameter]:
+        try:
+            entry_fields = config.get_value("entry_fields") or []
+        except SystemExit:
+            return []
+        options: typing.List[click.Parameter] = []
+        for entry_field in entry_fields:
+            name = (entry_field.get("name") or "").replace("_", "-")
+            if not name or " " in name:
+                continue
+            kwargs = dict()
+            verbose_name = entry_field.get("verbose_name")
+            if verbose_name:
+                kwargs["help"] = verbose_name
+
+            options.insert(0, click.Option([f"--{name}"], **kwargs))
+        return options
+
+
+def entry_command_decorator(func: typing.Callable) -> click.Command:
+    return command_decorator(func, cls=EntryCommand)
 
 
 @command_decorator
@@ -53,10 +172,18 @@ def init(
 
 @command_decorator
 @click.argument("version", required=False)
+@jobs_option
 def draft(
-    _: click.core.Context, config: Config, version: str, **options: typing.Optional[str]
+    _: click.core.Context,
+    config: Config,
+    version: str,
+    jobs: int = 1,
+    **options: typing.Optional[str],
 ) -> None:
     """Generate draft changelog to stdout."""
+    from . import changelogd
+
+    config.settings["jobs"] = jobs
     if version is None:
         version = "draft"
     changelogd.draft(config, version)
@@ -69,15 +196,20 @@ def draft(
     is_flag=True,
     help="Do not crash if there are no entry files.",
 )
+@jobs_option
 def release(
     _: click.core.Context,
     config: Config,
     version: str,
     empty: bool = False,
+    jobs: int = 1,
     **options: typing.Optional[str],
 ) -> None:
     """Generate changelog, clear entries and make a new release."""
+    from . import changelogd
+
     config.settings["empty"] = empty
+    config.settings["jobs"] = jobs
     changelogd.release(config=config, version=version)
 
 
@@ -85,30 +217,98 @@ def release(
 @click.option(
     "--check", help="Return exit code 1 if output file is different.", is_flag=True
 )
+@jobs_option
 def partial(
-    _: click.core.Context, config: Config, check: bool, **options: typing.Optional[str]
+    _: click.core.Context,
+    config: Config,
+    check: bool,
+    jobs: int = 1,
+    **options: typing.Optional[str],
 ) -> None:
     """
     Generate changelog without clearing entries, release name is taken from config file.
     """
+    from . import changelogd
+
+    config.settings["jobs"] = jobs
     changelogd.release(config=config, check=check, partial=True)
 
 
-@command_decorator
-@dynamic_options
+@entry_command_decorator
+@click.option("--type", help="Message type (as number or string).")
 @click.option("--release", help="Attach entry to a release.")
+@click.option(
+    "--from-file",
+    type=click.File("r"),
+    help="Read entries from a JSONL/CSV file ('-' for stdin).",
+)
 def entry(
-    _: click.core.Context,
+    ctx: click.core.Context,
     config: Config,
     release: typing.Optional[str],
+    from_file: typing.Optional[typing.IO[str]],
     **options: typing.Optional[str],
 ) -> None:
     """Create a new changelog entry."""
-    changelogd.entry(config, release, options)
+    from . import changelogd
+
+    if from_file is not None:
+        # the fields of the bulk entries are taken only from the file
+        field_options = ctx.meta.get("entry_field_options", [])
+        field_names = {param.name for param in field_options} | {"type"}
+        for param in ctx.command.get_params(ctx):
+            if param.name in field_names and options.get(param.name) is not None:
+                raise click.UsageError(
+                    f"Option '{param.opts[0]}' cannot be used with '--from-file'.", ctx
+                )
+
+    changelogd.entry(config, release, options, from_file)
+
+
+@command_decorator
+@click.option(
+    "--format",
+    "storage_format",
+    type=click.Choice(STORAGE_FORMATS),
+    required=True,
+    help="Target storage format.",
+)
+def migrate(
+    _: click.core.Context,
+    config: Config,
+    storage_format: str,
+    **options: typing.Optional[str],
+) -> None:
+    """Convert entry and release files into a different storage format."""
+    from . import changelogd
+
+    changelogd.migrate(config, storage_format)
+
+
+@command_decorator
+@click.option(
+    "--keep",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    help="Number of the newest releases that are not packed.",
+)
+@click.option("--before", help="Pack releases older than the given release.")
+def compact(
+    _: click.core.Context,
+    config: Config,
+    keep: int,
+    before: typing.Optional[str],
+    **options: typing.Optional[str],
+) -> None:
+    """Pack old release files into a single archive file."""
+    from . import changelogd
+
+    changelogd.compact(config, keep, before)
 
 
 def register_commands(cli: click.core.Group) -> None:
-    commands = (init, draft, partial, release, entry)
+    commands = (init, draft, partial, release, entry, migrate, compact)
 
     for command in commands:
         cli.add_command(command)
@@ -1,27 +1,102 @@
+import functools
 import logging
 import re
 import subprocess
 import sys
+import threading
 import typing
 from typing import List
 from typing import Optional
 
+from .git import GitRepository
+from .git import UnsupportedRepository
+from .metrics import metrics
 
+# seconds to wait for a computed value before the `default` is used
+DEFAULT_TIMEOUT = 10.0
+
+
+class _Evaluation:
+    """A computed value function, evaluated only once per process."""
+
+    def __init__(self, function: typing.Callable[[], Optional[str]]) -> None:
+        self._function = function
+        self._done = threading.Event()
+        self._value: Optional[str] = None
+        self._error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._value = self._function()
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self._done.set()
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        if not self._done.wait(timeout):
+            raise TimeoutError()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+_evaluations: typing.Dict[str, _Evaluation] = {}
+_evaluations_lock = threading.Lock()
+
+
+def _get_evaluation(
+    function: typing.Callable[[], Optional[str]],
+) -> typing.Tuple[_Evaluation, bool]:
+    """Get the evaluation of the function, and whether it was just created."""
+    with _evaluations_lock:
+        evaluation = _evaluations.get(function.__name__)
+        if evaluation is not None:
+            return evaluation, False
+        evaluation = _evaluations[function.__name__] = _Evaluation(function)
+        return evaluation, True
+
+
+def _memoized(
+    function: typing.Callable[[], Optional[str]],
+) -> typing.Callable[[], Optional[str]]:
+    @functools.wraps(function)
+    def wrapper() -> Optional[str]:
+        evaluation, created = _get_evaluation(function)
+        if created:
+            evaluation.run()
+        return evaluation.result()
+
+    return wrapper
+
+
+def clear_cache() -> None:
+    """Forget the memoized values, so the functions are evaluated again."""
+    with _evaluations_lock:
+        _evaluations.clear()
+
+
+@_memoized
 def remote_branch_name() -> Optional[str]:
     """Extract remote branch name"""
-    return _value_from_process(
+    return _value_from_repository(
+        GitRepository.remote_branch_name,
         ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
         "remote branch name",
     )
 
 
+@_memoized
 def local_branch_name() -> Optional[str]:
     """Extract local branch name"""
-    return _value_from_process(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"], "local branch name"
+    return _value_from_repository(
+        GitRepository.local_branch_name,
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        "local branch name",
     )
 
 
+@_memoized
 def branch_name() -> Optional[str]:
     """Extract local AND remote branch name separated by space"""
     data = []
@@ -35,13 +110,33 @@ def branch_name() -> Optional[str]:
     return result or None
 
 
+@_memoized
 def last_commit_message() -> Optional[str]:
     """Get the last commit message."""
-    return _value_from_process(
-        ["git", "log", "-1", "--pretty=%B"], "last commit message"
+    return _value_from_repository(
+        GitRepository.last_commit_message,
+        ["git", "log", "-1", "--pretty=%B"],
+        "last commit message",
     )
 
 
+def _value_from_repository(
+    method: typing.Callable[[GitRepository], str],
+    command: List[str],
+    error_context: str,
+) -> Optional[str]:
+    """Read the value directly from the repository files, or run git if that's
+    not possible."""
+    repository = GitRepository.discover()
+    if repository is not None:
+        try:
+            return method(repository)
+        except (UnsupportedRepository, OSError) as exc:
+            logging.debug(f"Cannot read the {error_context} directly: {exc}")
+    return _value_from_process(command, error_context)
+
+
+@metrics.timed("git")
 def _value_from_process(
     command: List[str], error_context: Optional[str] = None
 ) -> Optional[str]:
@@ -66,7 +161,7 @@ class ComputedValueProcessor:
         last_commit_message,
     )
 
-    def __init__(self, data: dict):
+    def __init__(self, data: typing.Mapping[str, typing.Any]):
         type_ = data.get("type", None)
         if not type_:
             sys.exit(f"Missing `type` for computed value: {dict(**data)}")
@@ -84,14 +179,55 @@ class ComputedValueProcessor:
         self.name = data.get("name", None) or type_
         self.regex = data.get("regex", None)
         self.default = data.get("default", None)
+        self.timeout = data.get("timeout", DEFAULT_TIMEOUT)
+        if (
+            isinstance(self.timeout, bool)
+            or not isinstance(self.timeout, (int, float))
+            or self.timeout <= 0
+        ):
+            sys.exit(f"Invalid `timeout` for computed value: {dict(**data)}")
         self._data = data
 
     @classmethod
     def from_string(cls, value: str) -> "ComputedValueProcessor":
         return cls({"type": value})
 
+    @classmethod
+    def from_default(
+        cls, default: typing.Mapping[str, typing.Any]
+    ) -> "ComputedValueProcessor":
+        """Create the processor for an `entry_fields` default: `{compute: <type>}`."""
+        data = {"type": default["compute"]}
+        if "timeout" in default:
+            data["timeout"] = default["timeout"]
+        return cls(data)
+
+    def start(self) -> _Evaluation:
+        """Start evaluating the value in the background.
+
+        The daemon thread doesn't block the exit if the function hangs.
+        """
+        # the evaluation runs the original function, not the memoized wrapper
+        function = getattr(self.function, "__wrapped__", self.function)
+        evaluation, created = _get_evaluation(function)
+        if created:
+            threading.Thread(target=evaluation.run, daemon=True).start()
+        return evaluation
+
+    def get_value(self) -> Optional[str]:
+        """Get the value, or `None` if it wasn't computed within the timeout."""
+        evaluation = self.start()
+        try:
+            return evaluation.result(self.timeout)
+        except TimeoutError:
+            logging.warning(
+                f"Computing the '{self.name}' value "
+                f"didn't finish within {self.timeout} seconds."
+            )
+            return None
+
     def get_data(self) -> typing.Dict[str, typing.Any]:
-        value = self.function()
+        value = self.get_value()
         if self.regex:
             match = re.search(self.regex, value) if value is not None else None
             if match:
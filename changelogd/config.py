@@ -7,67 +7,71 @@ import typing
 from copy import deepcopy
 from pathlib import Path
 
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
-
 import click
-from ruamel.yaml import YAML  # type: ignore
-from ruamel.yaml.comments import CommentedMap  # type: ignore
 
-yaml = YAML()
+from .metrics import metrics
+
+if typing.TYPE_CHECKING:
+    from ruamel.yaml import YAML  # type: ignore
 
 DEFAULT_PATH = Path(os.getcwd()) / "changelog.d"
 DEFAULT_OUTPUT = "../changelog."
 PARTIAL_KEY_NAME = "partial_release_name"
 DEFAULT_PARTIAL_VALUE = "unreleased"
 DEFAULT_USER_DATA = ["os_user", "git_user", "git_email"]
-DEFAULT_CONFIG = CommentedMap(
-    {
-        "entry_fields": [
-            {
-                "name": "issue_id",
-                "verbose_name": "Issue ID",
-                "type": "str",
-                "required": False,
-                "multiple": True,
-            },
-            {
-                "name": "message",
-                "verbose_name": "Changelog message",
-                "type": "str",
-                "required": True,
-            },
-        ],
-        "output_file": DEFAULT_OUTPUT,
-        PARTIAL_KEY_NAME: DEFAULT_PARTIAL_VALUE,
-        "user_data": DEFAULT_USER_DATA,
-    }
-)
-DEFAULT_CONFIG.insert(
-    0,
-    "context",
-    {"issues_url": "http://repo/issues"},
-    comment="All variables defined here will be passed into templates",
-)
-DEFAULT_CONFIG.insert(
-    1,
-    "message_types",
-    [
+DEFAULT_CACHE_DIR = ".cache"
+DEFAULT_CONFIG: typing.Dict[str, typing.Any] = {
+    # All variables defined here will be passed into templates
+    "context": {"issues_url": "http://repo/issues"},
+    # The order defined below will be preserved in the output changelog file
+    "message_types": [
         {"name": "feature", "title": "Features"},
         {"name": "bug", "title": "Bug fixes"},
         {"name": "doc", "title": "Documentation changes"},
         {"name": "deprecation", "title": "Deprecations"},
         {"name": "other", "title": "Other changes"},
     ],
-    comment="The order defined below will be preserved in the output changelog file",
-)
+    "entry_fields": [
+        {
+            "name": "issue_id",
+            "verbose_name": "Issue ID",
+            "type": "str",
+            "required": False,
+            "multiple": True,
+        },
+        {
+            "name": "message",
+            "verbose_name": "Changelog message",
+            "type": "str",
+            "required": True,
+        },
+    ],
+    "output_file": DEFAULT_OUTPUT,
+    PARTIAL_KEY_NAME: DEFAULT_PARTIAL_VALUE,
+    "user_data": DEFAULT_USER_DATA,
+}
+
+_yaml: typing.Optional["YAML"] = None
+
+
+def get_yaml() -> "YAML":
+    """Get the round-trip YAML parser, `ruamel.yaml` is imported on first use."""
+    global _yaml
+    if _yaml is None:
+        from ruamel.yaml import YAML
+
+        _yaml = YAML()
+    return _yaml
 
 
 def load_toml(path: Path) -> typing.Optional[str]:
     if not path.is_file():
         return None
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
+
     with path.open("rb") as file_handle:
         config = tomllib.load(file_handle)
 
@@ -87,6 +91,73 @@ def load_ini(path: Path) -> typing.Optional[str]:
         return None
 
 
+class FrozenMapping(typing.Mapping[str, typing.Any]):
+    """Read-only view of a mapping from the configuration.
+
+    Nested values are wrapped into views when accessed, so nothing is copied.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: typing.Mapping[str, typing.Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, key: str) -> typing.Any:
+        return freeze(self._data[key])
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+
+class FrozenSequence(typing.Sequence[typing.Any]):
+    """Read-only view of a list from the configuration."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: typing.Sequence[typing.Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, index: typing.Any) -> typing.Any:
+        if isinstance(index, slice):
+            return FrozenSequence(self._data[index])
+        return freeze(self._data[index])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenSequence):
+            other = other._data
+        return bool(self._data == other)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+
+def freeze(value: typing.Any) -> typing.Any:
+    """Wrap dicts and lists into read-only views."""
+    if isinstance(value, dict):
+        return FrozenMapping(value)
+    if isinstance(value, list):
+        return FrozenSequence(value)
+    return value
+
+
+def thaw(value: typing.Any) -> typing.Any:
+    """Get a mutable copy of the value returned from the configuration."""
+    if isinstance(value, (FrozenMapping, FrozenSequence)):
+        return deepcopy(value._data)
+    return deepcopy(value)
+
+
 CONFIG_SNIPPET = "[tool:changelogd]\nconfig={path}"
 CONFIG_SNIPPET_TOML = "[tool.changelogd]\nconfig = '{path}'"
 
@@ -117,8 +188,9 @@ class Config:
         else:
             self._path = None
         self._data: typing.Optional[dict] = None
+        self._view: typing.Optional[FrozenMapping] = None
 
-    def get_context(self) -> typing.Dict[str, typing.Any]:
+    def get_context(self) -> typing.Mapping[str, typing.Any]:
         return self.get_value("context") or {}
 
     def get_bool_setting(self, name: str) -> bool:
@@ -139,17 +211,33 @@ class Config:
         output_path = self.get_value("output_file", DEFAULT_OUTPUT)
         return Path((self.path / output_path).resolve())
 
+    @property
+    def cache_dir(self) -> typing.Optional[Path]:
+        cache_dir = self.get_value("cache_dir", DEFAULT_CACHE_DIR)
+        if not cache_dir:
+            return None
+        return self.path / str(cache_dir)
+
     @property
     def partial_name(self) -> str:
         return str(self.get_value(PARTIAL_KEY_NAME, DEFAULT_PARTIAL_VALUE))
 
-    def get_data(self) -> dict:
+    @property
+    def data(self) -> FrozenMapping:
+        """Read-only view of the configuration data."""
         if self._data is None:
             self._data = self._load_data()
-        return deepcopy(self._data)
+        if self._view is None or self._view._data is not self._data:
+            self._view = FrozenMapping(self._data)
+        return self._view
+
+    def get_data(self) -> dict:
+        """Get a copy of the configuration data, that can be modified."""
+        return typing.cast(dict, thaw(self.data))
 
     def get_value(self, key: str, default: typing.Any = None) -> typing.Any:
-        return self.get_data().get(key, default)
+        """Get a read-only value from the configuration, use `thaw()` to modify it."""
+        return self.data.get(key, default)
 
     def _get_path(self) -> Path:
         path = self._search_config() or DEFAULT_PATH
@@ -171,8 +259,9 @@ class Config:
             )
 
         with config_file.open() as config:
-            return yaml.load(config) or {}
+            return get_yaml().load(config) or {}
 
+    @metrics.timed("config_discovery")
     def _search_config(self) -> typing.Optional[Path]:
         for config_file, load_function, _ in SUPPORTED_CONFIG_FILES:
             config_path = load_function(config_file)  # type: ignore
@@ -223,7 +312,7 @@ class Config:
 
         output_path = output_directory / "config.yaml"
         with output_path.open("w+") as output_stream:
-            yaml.dump(config_data, output_stream)
+            get_yaml().dump(config_data, output_stream)
 
         if output_path.is_file():
             logging.warning(
@@ -0,0 +1,559 @@
+"""Read the git metadata directly from the repository files.
+
+Only the common repository layouts are supported - if anything unusual is found
+(e.g. conditional includes, the reftable format, or the SHA-256 object format),
+`UnsupportedRepository` is raised and git itself should be used instead.
+"""
+
+import mmap
+import os
+import re
+import struct
+import typing
+import zlib
+from pathlib import Path
+
+# the environment variables that change how git finds or reads the repository
+GIT_ENVIRONMENT = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+    "GIT_CONFIG",
+    "GIT_CONFIG_PARAMETERS",
+    "GIT_CONFIG_COUNT",
+    "GIT_NAMESPACE",
+    "GIT_REPLACE_REF_BASE",
+    "GIT_NO_REPLACE_OBJECTS",
+)
+
+MAX_INCLUDE_DEPTH = 10
+MAX_SYMREF_DEPTH = 5
+
+OBJECT_TYPES = {1: b"commit", 2: b"tree", 3: b"blob", 4: b"tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+SECTION_RE = re.compile(
+    r'\[\s*([-.\w]+)\s*(?:"((?:[^"\\]|\\.)*)")?\s*\]', flags=re.ASCII
+)
+KEY_RE = re.compile(r"([a-zA-Z][-a-zA-Z0-9]*)[ \t]*(=?)")
+
+
+class UnsupportedRepository(Exception):
+    """The repository cannot be read directly, git has to be used instead."""
+
+
+class GitRepository:
+    """Access to the current branch, its upstream, the last commit and the git
+    configuration without running git.
+
+    The returned values are formatted exactly like the output of git commands,
+    including the trailing newline.
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Path) -> None:
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._config: typing.Optional[typing.Dict[str, typing.List[str]]] = None
+        self._packed_refs: typing.Optional[typing.Dict[str, str]] = None
+
+    @classmethod
+    def discover(
+        cls, path: typing.Optional[Path] = None
+    ) -> typing.Optional["GitRepository"]:
+        """Find the repository containing the given (or current) directory.
+
+        Returns `None` if there is no repository, or it cannot be found the same
+        way as git would find it.
+        """
+        if any(name in os.environ for name in GIT_ENVIRONMENT):
+            return None
+        directory = (path or Path.cwd()).absolute()
+        for candidate in (directory, *directory.parents):
+            dot_git = candidate / ".git"
+            git_dir: typing.Optional[Path] = None
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                git_dir = _read_gitdir_file(dot_git)
+            else:
+                continue
+            if git_dir is None:
+                return None
+            if not (git_dir / "HEAD").is_file() or not _is_owned(candidate):
+                return None
+            common_dir = git_dir
+            if (git_dir / "commondir").is_file():
+                common_dir = git_dir / (git_dir / "commondir").read_text().strip()
+            return cls(git_dir, common_dir)
+        return None
+
+    def config(self) -> typing.Dict[str, typing.List[str]]:
+        """All values from the git configuration files, in the order of precedence.
+
+        The section and key names are lowercase, like in `git config --list`.
+        """
+        if self._config is None:
+            config: typing.Dict[str, typing.List[str]] = {}
+            for path in self._get_config_paths():
+                _read_config(path, config)
+            if _get_last(config, "extensions.worktreeconfig") in ("true", "yes", "on"):
+                _read_config(self.git_dir / "config.worktree", config)
+            self._config = config
+        return self._config
+
+    def get_config_value(self, key: str) -> typing.Optional[str]:
+        return _get_last(self.config(), key)
+
+    def local_branch_name(self) -> str:
+        """The same as `git rev-parse --abbrev-ref HEAD`."""
+        ref, _ = self._resolve("HEAD")
+        if ref == "HEAD":
+            return "HEAD\n"
+        return self._shorten_ref(ref) + "\n"
+
+    def remote_branch_name(self) -> str:
+        """The same as `git rev-parse --abbrev-ref --symbolic-full-name @{u}`."""
+        ref, _ = self._resolve("HEAD")
+        if not ref.startswith("refs/heads/"):
+            raise UnsupportedRepository("HEAD is not a branch")
+        branch = ref[len("refs/heads/") :]
+        remote = self.get_config_value(f"branch.{branch}.remote")
+        merge = self.get_config_value(f"branch.{branch}.merge")
+        if not remote or not merge:
+            raise UnsupportedRepository(f"no upstream configured for '{branch}'")
+        if remote == ".":
+            upstream = merge
+        else:
+            upstream = self._map_fetched_ref(remote, merge)
+        if self._read_ref(upstream) is None:
+            raise UnsupportedRepository(f"the upstream ref '{upstream}' is missing")
+        return self._shorten_ref(upstream) + "\n"
+
+    def last_commit_message(self) -> str:
+        """The same as `git log -1 --pretty=%B`."""
+        config = self.config()
+        for key in ("log.showsignature", "i18n.logoutputencoding"):
+            if key in config:
+                raise UnsupportedRepository(f"'{key}' is set")
+        if self._has_replace_refs():
+            raise UnsupportedRepository("replace refs are used")
+        _, sha = self._resolve("HEAD")
+        object_type, data = self._read_object(sha)
+        if object_type != b"commit":
+            raise UnsupportedRepository(f"HEAD points to a {object_type.decode()}")
+        headers, _, message = data.partition(b"\n\n")
+        for header in headers.split(b"\n"):
+            if header.startswith(b"encoding "):
+                raise UnsupportedRepository("the commit message has custom encoding")
+        try:
+            return message.decode() + "\n"
+        except UnicodeDecodeError as exc:
+            raise UnsupportedRepository("the commit message is not UTF-8") from exc
+
+    def _get_config_paths(self) -> typing.List[Path]:
+        paths = []
+        if "GIT_CONFIG_NOSYSTEM" not in os.environ:
+            paths.append(Path(os.environ.get("GIT_CONFIG_SYSTEM", "/etc/gitconfig")))
+        if "GIT_CONFIG_GLOBAL" in os.environ:
+            paths.append(Path(os.environ["GIT_CONFIG_GLOBAL"]))
+        else:
+            xdg_config = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+                os.path.expanduser("~"), ".config"
+            )
+            paths.append(Path(xdg_config) / "git" / "config")
+            paths.append(Path(os.path.expanduser("~")) / ".gitconfig")
+        paths.append(self.common_dir / "config")
+        return paths
+
+    def _check_format(self) -> None:
+        config = self.config()
+        if _get_last(config, "extensions.objectformat") not in (None, "sha1"):
+            raise UnsupportedRepository("only the SHA-1 object format is supported")
+        if _get_last(config, "extensions.refstorage") not in (None, "files"):
+            raise UnsupportedRepository("only the files ref storage is supported")
+
+    def _resolve(self, name: str) -> typing.Tuple[str, str]:
+        """Follow the symbolic refs, return the final ref name and the object id."""
+        self._check_format()
+        ref = name
+        for _ in range(MAX_SYMREF_DEPTH):
+            value = self._read_ref(ref)
+            if value is None:
+                raise UnsupportedRepository(f"cannot resolve '{ref}'")
+            if not value.startswith("ref: "):
+                return ref, value
+            ref = value[len("ref: ") :]
+        raise UnsupportedRepository(f"too many symbolic refs for '{name}'")
+
+    def _read_ref(self, ref: str) -> typing.Optional[str]:
+        # HEAD and other pseudo refs are specific for each worktree
+        directory = self.git_dir if "/" not in ref else self.common_dir
+        try:
+            value = (directory / ref).read_text().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            value = None
+        if value:
+            return value
+        return self._get_packed_refs().get(ref)
+
+    def _get_packed_refs(self) -> typing.Dict[str, str]:
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            try:
+                lines = (self.common_dir / "packed-refs").read_text().splitlines()
+            except FileNotFoundError:
+                lines = []
+            for line in lines:
+                if not line or line[0] in "#^":
+                    continue
+                sha, _, ref = line.partition(" ")
+                self._packed_refs[ref] = sha
+        return self._packed_refs
+
+    def _has_replace_refs(self) -> bool:
+        if any(ref.startswith("refs/replace/") for ref in self._get_packed_refs()):
+            return True
+        replace_dir = self.common_dir / "refs" / "replace"
+        return replace_dir.is_dir() and any(replace_dir.iterdir())
+
+    def _shorten_ref(self, ref: str) -> str:
+        """Shorten the ref name, unless the short name would be ambiguous."""
+        for prefix in ("refs/heads/", "refs/tags/", "refs/remotes/"):
+            if ref.startswith(prefix):
+                short = ref[len(prefix) :]
+                break
+        else:
+            raise UnsupportedRepository(f"cannot shorten '{ref}'")
+        candidates = (
+            short,
+            f"refs/{short}",
+            f"refs/tags/{short}",
+            f"refs/heads/{short}",
+            f"refs/remotes/{short}",
+            f"refs/remotes/{short}/HEAD",
+        )
+        for candidate in candidates:
+            if candidate != ref and self._read_ref(candidate) is not None:
+                raise UnsupportedRepository(f"the '{short}' ref name is ambiguous")
+        return short
+
+    def _map_fetched_ref(self, remote: str, merge: str) -> str:
+        """Map a ref from the remote repository to the remote-tracking ref."""
+        for refspec in self.config().get(f"remote.{remote}.fetch", []):
+            source, _, destination = refspec.lstrip("+").partition(":")
+            if "*" not in source:
+                if source == merge and destination:
+                    return destination
+                continue
+            prefix, _, suffix = source.partition("*")
+            if (
+                merge.startswith(prefix)
+                and merge.endswith(suffix)
+                and len(merge) >= len(prefix) + len(suffix)
+            ):
+                matched = merge[len(prefix) : len(merge) - len(suffix)]
+                return destination.replace("*", matched, 1)
+        raise UnsupportedRepository(f"'{merge}' is not fetched from '{remote}'")
+
+    def _get_object_dirs(self) -> typing.List[Path]:
+        objects_dir = self.common_dir / "objects"
+        object_dirs = [objects_dir]
+        try:
+            alternates = (objects_dir / "info" / "alternates").read_text()
+        except FileNotFoundError:
+            return object_dirs
+        for line in alternates.splitlines():
+            if line and not line.startswith("#"):
+                object_dirs.append(objects_dir / line)
+        return object_dirs
+
+    def _read_object(self, sha: str) -> typing.Tuple[bytes, bytes]:
+        if not re.fullmatch("[0-9a-f]{40}", sha):
+            raise UnsupportedRepository(f"invalid object id: {sha}")
+        object_dirs = self._get_object_dirs()
+        for objects_dir in object_dirs:
+            try:
+                compressed = (objects_dir / sha[:2] / sha[2:]).read_bytes()
+            except FileNotFoundError:
+                continue
+            try:
+                decompressed = zlib.decompress(compressed)
+            except zlib.error as exc:
+                raise UnsupportedRepository(f"the object {sha} is corrupted") from exc
+            header, _, data = decompressed.partition(b"\0")
+            return header.split(b" ")[0], data
+        for objects_dir in object_dirs:
+            pack_dir = objects_dir / "pack"
+            if not pack_dir.is_dir():
+                continue
+            for index_path in sorted(pack_dir.glob("*.idx")):
+                offset = _find_in_pack_index(index_path, bytes.fromhex(sha))
+                if offset is not None:
+                    return self._read_packed_object(
+                        index_path.with_suffix(".pack"), offset
+                    )
+        raise UnsupportedRepository(f"the object {sha} is missing")
+
+    def _read_packed_object(
+        self, path: Path, offset: int
+    ) -> typing.Tuple[bytes, bytes]:
+        with path.open("rb") as pack_fh:
+            with mmap.mmap(pack_fh.fileno(), 0, access=mmap.ACCESS_READ) as pack:
+                return self._unpack(pack, offset)
+
+    def _unpack(self, pack: mmap.mmap, offset: int) -> typing.Tuple[bytes, bytes]:
+        byte = pack[offset]
+        object_type = (byte >> 4) & 7
+        position = offset + 1
+        while byte & 0x80:
+            byte = pack[position]
+            position += 1
+        if object_type in OBJECT_TYPES:
+            return OBJECT_TYPES[object_type], _inflate(pack, position)
+        if object_type == OFS_DELTA:
+            byte = pack[position]
+            position += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = pack[position]
+                position += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base_type, base = self._unpack(pack, offset - distance)
+        elif object_type == REF_DELTA:
+            base_sha = pack[position : position + 20].hex()
+            position += 20
+            base_type, base = self._read_object(base_sha)
+        else:
+            raise UnsupportedRepository(f"unknown packed object type: {object_type}")
+        return base_type, _apply_delta(base, _inflate(pack, position))
+
+
+def _read_gitdir_file(path: Path) -> typing.Optional[Path]:
+    """Read the `.git` file used by worktrees and submodules."""
+    content = path.read_text().strip()
+    if not content.startswith("gitdir: "):
+        return None
+    return path.parent / content[len("gitdir: ") :]
+
+
+def _is_owned(path: Path) -> bool:
+    """Git refuses to use the repositories owned by other users."""
+    if not hasattr(os, "getuid"):
+        return False
+    return path.stat().st_uid == os.getuid()
+
+
+def _get_last(
+    config: typing.Dict[str, typing.List[str]], key: str
+) -> typing.Optional[str]:
+    values = config.get(key)
+    return values[-1] if values else None
+
+
+def _read_config(
+    path: Path, config: typing.Dict[str, typing.List[str]], depth: int = 0
+) -> None:
+    """Read the values from the config file, including the files from `[include]`."""
+    try:
+        content = path.read_text()
+    except FileNotFoundError:
+        return
+    except UnicodeDecodeError as exc:
+        raise UnsupportedRepository(f"cannot read {path}") from exc
+    for key, value in _parse_config(content, path):
+        if key.startswith("includeif."):
+            raise UnsupportedRepository("conditional includes are not supported")
+        config.setdefault(key, []).append(value)
+        if key == "include.path":
+            if depth >= MAX_INCLUDE_DEPTH:
+                raise UnsupportedRepository("too many nested includes")
+            include_path = Path(os.path.expanduser(value))
+            _read_config(path.parent / include_path, config, depth + 1)
+
+
+def _parse_config(content: str, path: Path) -> typing.Iterator[typing.Tuple[str, str]]:
+    section = None
+    position = 0
+    while position < len(content):
+        character = content[position]
+        if character in " \t\r\n":
+            position += 1
+        elif character in "#;":
+            position = _skip_line(content, position)
+        elif character == "[":
+            match = SECTION_RE.match(content, position)
+            if not match:
+                raise UnsupportedRepository(f"invalid section in {path}")
+            name, subsection = match.groups()
+            if subsection is not None:
+                subsection = re.sub(r"\\(.)", r"\1", subsection)
+                section = f"{name.lower()}.{subsection}"
+            elif "." in name:
+                # deprecated `[section.subsection]` syntax
+                name, _, subsection = name.partition(".")
+                section = f"{name.lower()}.{subsection.lower()}"
+            else:
+                section = name.lower()
+            position = match.end()
+        else:
+            match = KEY_RE.match(content, position)
+            if not match or section is None:
+                raise UnsupportedRepository(f"invalid key in {path}")
+            key = f"{section}.{match.group(1).lower()}"
+            position = match.end()
+            if match.group(2):
+                value, position = _parse_value(content, position, path)
+            else:
+                # a key without a value is a boolean `true`
+                rest = content[position : _skip_line(content, position)].strip()
+                if rest and rest[0] not in "#;":
+                    raise UnsupportedRepository(f"invalid key in {path}")
+                value = "true"
+            yield key, value
+
+
+def _skip_line(content: str, position: int) -> int:
+    end = content.find("\n", position)
+    return len(content) if end == -1 else end + 1
+
+
+def _parse_value(content: str, position: int, path: Path) -> typing.Tuple[str, int]:
+    escapes = {"n": "\n", "t": "\t", "b": "\b", "\\": "\\", '"': '"'}
+    value: typing.List[str] = []
+    # the length of the value without the trailing unquoted whitespaces
+    length = 0
+    quoted = False
+    while position < len(content):
+        character = content[position]
+        position += 1
+        if character == "\n":
+            if quoted:
+                raise UnsupportedRepository(f"unterminated string in {path}")
+            break
+        if character == "\\":
+            escaped = content[position : position + 1]
+            position += 1
+            if escaped == "\n":
+                continue
+            if escaped == "\r" and content[position : position + 1] == "\n":
+                position += 1
+                continue
+            if escaped not in escapes:
+                raise UnsupportedRepository(f"invalid escape sequence in {path}")
+            value.append(escapes[escaped])
+            length = len(value)
+        elif character == '"':
+            quoted = not quoted
+            length = len(value)
+        elif not quoted and character in "#;":
+            position = _skip_line(content, position)
+            break
+        elif not quoted and character in " \t\r":
+            if value:
+                value.append(" ")
+        else:
+            value.append(character)
+            length = len(value)
+    else:
+        if quoted:
+            raise UnsupportedRepository(f"unterminated string in {path}")
+    return "".join(value[:length]), position
+
+
+def _find_in_pack_index(path: Path, sha: bytes) -> typing.Optional[int]:
+    """Find the offset of the object in the pack file with the version 2 index."""
+    with path.open("rb") as index_fh:
+        with mmap.mmap(index_fh.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            if index[:8] != b"\377tOc\0\0\0\2":
+                raise UnsupportedRepository(f"unsupported pack index: {path}")
+            fanout_start = 8
+            first = sha[0]
+            start = (
+                struct.unpack_from(">I", index, fanout_start + (first - 1) * 4)[0]
+                if first
+                else 0
+            )
+            end = struct.unpack_from(">I", index, fanout_start + first * 4)[0]
+            count = struct.unpack_from(">I", index, fanout_start + 255 * 4)[0]
+            names_start = fanout_start + 256 * 4
+            while start < end:
+                middle = (start + end) // 2
+                name_offset = names_start + middle * 20
+                name = index[name_offset : name_offset + 20]
+                if name < sha:
+                    start = middle + 1
+                elif name > sha:
+                    end = middle
+                else:
+                    break
+            else:
+                return None
+            offsets_start = names_start + count * 24
+            offset: int = struct.unpack_from(">I", index, offsets_start + middle * 4)[0]
+            if offset & 0x80000000:
+                large_offsets_start = offsets_start + count * 4
+                large_offset: int = struct.unpack_from(
+                    ">Q", index, large_offsets_start + (offset & 0x7FFFFFFF) * 8
+                )[0]
+                return large_offset
+            return offset
+
+
+def _inflate(data: mmap.mmap, position: int, chunk_size: int = 65536) -> bytes:
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = data[position : position + chunk_size]
+        if not chunk:
+            raise UnsupportedRepository("truncated pack file")
+        try:
+            chunks.append(decompressor.decompress(chunk))
+        except zlib.error as exc:
+            raise UnsupportedRepository("corrupted pack file") from exc
+        position += chunk_size
+    return b"".join(chunks)
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    def read_size(position: int) -> typing.Tuple[int, int]:
+        size = shift = 0
+        while True:
+            byte = delta[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return size, position
+
+    base_size, position = read_size(0)
+    result_size, position = read_size(position)
+    if base_size != len(base):
+        raise UnsupportedRepository("invalid delta base")
+    result = bytearray()
+    while position < len(delta):
+        command = delta[position]
+        position += 1
+        if command & 0x80:
+            copy_offset = copy_size = 0
+            for bit in range(4):
+                if command & (1 << bit):
+                    copy_offset |= delta[position] << (bit * 8)
+                    position += 1
+            for bit in range(3):
+                if command & (1 << (bit + 4)):
+                    copy_size |= delta[position] << (bit * 8)
+                    position += 1
+            result += base[copy_offset : copy_offset + (copy_size or 0x10000)]
+        elif command:
+            result += delta[position : position + command]
+            position += command
+        else:
+            raise UnsupportedRepository("invalid delta instruction")
+    if len(result) != result_size:
+        raise UnsupportedRepository("invalid delta result")
+    return bytes(result)
@@ -0,0 +1,209 @@
+"""Wall time and I/O counters of the command phases, saved with `--metrics-json`."""
+
+import functools
+import os
+import sys
+import threading
+import time
+import typing
+from pathlib import Path
+
+PHASES = (
+    "config_discovery",
+    "entry_discovery",
+    "entry_parsing",
+    "release_parsing",
+    "template_compilation",
+    "rendering",
+    "output_writing",
+    "git",
+)
+COUNTERS = ("files_opened", "bytes_read", "subprocesses")
+
+# audit events of starting a new process
+PROCESS_EVENTS = {
+    "subprocess.Popen",
+    "os.system",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.fork",
+    "os.exec",
+}
+
+# the module files opened by imports are not counted
+MODULE_SUFFIXES = (".py", ".pyc", ".so", ".pyd")
+
+T = typing.TypeVar("T")
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Any])
+
+
+class _Phase:
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self._metrics = metrics
+        self.name = name
+        self.start = 0.0
+        self.children_time = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+        self._metrics._get_stack().append(self)
+
+    def __exit__(self, *_: typing.Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        stack = self._metrics._get_stack()
+        stack.pop()
+        if stack:
+            stack[-1].children_time += elapsed
+        self._metrics._add_time(self.name, elapsed - self.children_time)
+
+
+class _NullPhase:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *_: typing.Any) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Metrics:
+    """Collect the wall time and I/O counters of the phases of a command.
+
+    The time of a phase excludes the phases nested in it, and the files and
+    processes are counted in the innermost phase of the current thread. The
+    counters rely on audit hooks, so they are not available before Python 3.8.
+    The bytes read are estimated as the size of the files opened for reading.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._hook_installed = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._start = 0.0
+        self._totals: typing.Dict[str, int] = {}
+        self._phases: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    def enable(self) -> None:
+        if not self._hook_installed and hasattr(sys, "addaudithook"):
+            # audit hooks cannot be removed, the hook is installed only once
+            sys.addaudithook(self._on_audit_event)
+            self._hook_installed = True
+        self._totals = {counter: 0 for counter in COUNTERS}
+        self._phases = {
+            name: {"seconds": 0.0, "calls": 0, **self._totals} for name in PHASES
+        }
+        self._start = time.perf_counter()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def phase(self, name: str) -> typing.ContextManager[None]:
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def timed(self, name: str) -> typing.Callable[[F], F]:
+        """Decorate the function, so its calls belong to the phase."""
+
+        def decorator(function: F) -> F:
+            @functools.wraps(function)
+            def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+                with self.phase(name):
+                    return function(*args, **kwargs)
+
+            return typing.cast(F, wrapper)
+
+        return decorator
+
+    def iterate(self, name: str, iterable: typing.Iterable[T]) -> typing.Iterator[T]:
+        """Iterate over the items, the time of producing them belongs to the phase."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        def get_counters(
+            values: typing.Mapping[str, typing.Any],
+        ) -> typing.Dict[str, typing.Optional[int]]:
+            return {
+                counter: values[counter] if self._hook_installed else None
+                for counter in COUNTERS
+            }
+
+        return {
+            "seconds": time.perf_counter() - self._start,
+            **get_counters(self._totals),
+            "phases": {
+                name: {
+                    "seconds": phase["seconds"],
+                    "calls": phase["calls"],
+                    **get_counters(phase),
+                }
+                for name, phase in self._phases.items()
+            },
+        }
+
+    def save(self, path: typing.Union[str, Path], **data: typing.Any) -> None:
+        import json
+
+        with open(path, "w") as metrics_fh:
+            json.dump({**data, **self.as_dict()}, metrics_fh, indent=2)
+            metrics_fh.write("\n")
+
+    def _get_stack(self) -> typing.List[_Phase]:
+        stack: typing.Optional[typing.List[_Phase]]
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[name]["seconds"] += seconds
+            self._phases[name]["calls"] += 1
+
+    def _count(self, counter: str, value: int = 1) -> None:
+        stack = self._get_stack()
+        with self._lock:
+            self._totals[counter] += value
+            if stack:
+                self._phases[stack[-1].name][counter] += value
+
+    def _on_audit_event(self, event: str, args: typing.Tuple[typing.Any, ...]) -> None:
+        if not self.enabled:
+            return
+        if event == "open":
+            path, mode, flags = args
+            if not isinstance(path, (str, bytes, os.PathLike)):
+                return
+            path = os.fsdecode(path)
+            if path.endswith(MODULE_SUFFIXES):
+                return
+            self._count("files_opened")
+            if _is_reading(mode, flags):
+                try:
+                    self._count("bytes_read", os.stat(path).st_size)
+                except OSError:
+                    pass
+        elif event in PROCESS_EVENTS:
+            self._count("subprocesses")
+
+
+def _is_reading(mode: typing.Optional[str], flags: typing.Optional[int]) -> bool:
+    if mode is not None:
+        return "r" in mode or "+" in mode
+    if flags is None:
+        return False
+    return (flags & os.O_ACCMODE) in (os.O_RDONLY, os.O_RDWR)
+
+
+metrics = Metrics()
@@ -1,11 +1,24 @@
+import functools
+import json
+import logging
 import os
 import sys
 import typing
 from pathlib import Path
 
 import jinja2
+import jinja2.meta
 
+from . import __version__
+from .cache import get_digest
+from .cache import prepare_cache_dir
+from .cache import RenderCache
+from .cache import TemplateReferences
 from .config import Config
+from .config import FrozenMapping
+from .config import FrozenSequence
+from .config import thaw
+from .metrics import metrics
 
 
 class Resolver:
@@ -14,24 +27,146 @@ class Resolver:
     def __init__(self, config: Config):
         self._config: Config = config
         self._templates_dir: Path = config.path / "templates"
+        # templates get plain containers, not the read-only configuration views
+        self._context: typing.Dict[str, typing.Any] = thaw(config.get_context())
 
     def full_resolve(self, releases: typing.List[typing.Dict]) -> str:
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(self._templates_dir.as_posix()),
-        )
+        return "".join(self.stream_resolve(releases))
+
+    def stream_resolve(
+        self, releases: typing.List[typing.Dict]
+    ) -> typing.Iterator[str]:
+        """Resolve the changelog chunk by chunk.
 
+        Releases are rendered on demand, when the main template reaches them,
+        so the whole changelog is never kept in memory.
+        """
+        env = self._get_environment()
         templates = self._get_template_file_names(
             self._templates_dir, ("entry", "main", "release"), env
         )
-
-        message_types = self._config.get_value("message_types", [])
-        resolved_releases = [
-            self._resolve_release(message_types, release, templates)
-            for release in releases
-        ]
+        cache = RenderCache(self._config.cache_dir)
+        resolved_releases = _ResolvedReleases(
+            self._get_release_resolver(env, templates, cache), releases
+        )
 
         template = templates["main"]
-        return template.render(**self._config.get_context(), releases=resolved_releases)
+        yield from template.generate(**self._context, releases=resolved_releases)
+        cache.prune()
+        cache.save()
+
+    def resolve_releases(self, releases: typing.List[typing.Dict]) -> typing.List[str]:
+        """Resolve releases without putting them into the main template."""
+        env = self._get_environment()
+        templates = self._get_template_file_names(
+            self._templates_dir, ("entry", "release"), env
+        )
+        cache = RenderCache(self._config.cache_dir)
+        resolve = self._get_release_resolver(env, templates, cache)
+        resolved_releases = [resolve(release) for release in releases]
+        cache.save()
+        return resolved_releases
+
+    def resolve_main(self, releases: typing.List[str]) -> str:
+        """Put the already resolved releases into the main template."""
+        env = self._get_environment()
+        templates = self._get_template_file_names(self._templates_dir, ("main",), env)
+        return templates["main"].render(**self._context, releases=releases)
+
+    def _get_environment(self) -> jinja2.Environment:
+        return jinja2.Environment(
+            loader=jinja2.FileSystemLoader(self._templates_dir.as_posix()),
+            bytecode_cache=self._get_bytecode_cache(),
+        )
+
+    def _get_bytecode_cache(self) -> typing.Optional[jinja2.BytecodeCache]:
+        """Get cache for compiled templates, it is invalidated by Jinja
+        when the template source changes."""
+        cache_dir = self._config.cache_dir
+        if cache_dir is None:
+            return None
+        bytecode_dir = cache_dir / "jinja"
+        try:
+            prepare_cache_dir(cache_dir)
+            bytecode_dir.mkdir(exist_ok=True)
+        except OSError as exc:
+            logging.info(f"Cannot create templates cache directory: {exc}")
+            return None
+        return jinja2.FileSystemBytecodeCache(bytecode_dir.as_posix())
+
+    def _get_release_resolver(
+        self,
+        env: jinja2.Environment,
+        templates: typing.Dict[str, jinja2.Template],
+        cache: RenderCache,
+    ) -> typing.Callable[[typing.Dict], str]:
+        message_types = thaw(self._config.get_value("message_types", []))
+        templates_digest = self._get_templates_digest(
+            env, (str(templates["entry"].name), str(templates["release"].name))
+        )
+        return functools.partial(
+            self._resolve_cached_release,
+            message_types,
+            templates=templates,
+            cache=cache,
+            templates_digest=templates_digest,
+        )
+
+    def _resolve_cached_release(
+        self,
+        message_types: typing.List[typing.Dict],
+        release: typing.Dict,
+        templates: typing.Dict[str, jinja2.Template],
+        cache: RenderCache,
+        templates_digest: str,
+    ) -> str:
+        """Resolve the release, unless the same release was rendered before."""
+        key_data = {
+            "version": __version__,
+            "release": release,
+            "templates": templates_digest,
+            "context": self._context,
+            "message_types": message_types,
+        }
+        key = get_digest(
+            json.dumps(key_data, sort_keys=True, default=_json_default).encode()
+        )
+        resolved = cache.get(key)
+        if resolved is None:
+            resolved = self._resolve_release(message_types, dict(release), templates)
+            cache.put(key, resolved)
+        return resolved
+
+    @metrics.timed("template_compilation")
+    def _get_templates_digest(
+        self, env: jinja2.Environment, names: typing.Iterable[str]
+    ) -> str:
+        """Calculate digest of the templates' sources, including all their references.
+
+        The references of a template are cached by its source digest, so only
+        the templates that changed since the last run are parsed.
+        """
+        references_cache = TemplateReferences(self._config.cache_dir)
+        sources = {}
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in sources:
+                continue
+            try:
+                source, *_ = env.loader.get_source(env, name)  # type: ignore
+            except jinja2.exceptions.TemplateNotFound:
+                sources[name] = ""
+                continue
+            sources[name] = source
+            source_digest = get_digest(source.encode())
+            references = references_cache.get(source_digest)
+            if references is None:
+                references = _find_referenced_templates(env, source)
+                references_cache.put(source_digest, references)
+            pending.extend(references)
+        references_cache.save()
+        return get_digest(json.dumps(sources, sort_keys=True).encode())
 
     def _resolve_release(
         self,
@@ -55,8 +190,9 @@ class Resolver:
                     )
 
         template = templates["release"]
-        return template.render(**self._config.get_context(), **release)
+        return template.render(**self._context, **release)
 
+    @metrics.timed("template_compilation")
     def _get_template_file_names(
         self,
         templates_dir: Path,
@@ -80,4 +216,46 @@ class Resolver:
             sys.exit(f"Template file for '{exc.name}' not found.")
 
     def _resolve_entry(self, entry: typing.Dict, template: jinja2.Template) -> str:
-        return template.render(**self._config.get_context(), **entry)
+        return template.render(**self._context, **entry)
+
+
+def _find_referenced_templates(
+    env: jinja2.Environment, source: str
+) -> typing.List[str]:
+    try:
+        parsed = env.parse(source)
+    except jinja2.exceptions.TemplateSyntaxError:
+        return []
+    return [
+        reference
+        for reference in jinja2.meta.find_referenced_templates(parsed)
+        if reference is not None
+    ]
+
+
+def _json_default(value: typing.Any) -> typing.Any:
+    if isinstance(value, FrozenMapping):
+        return dict(value)
+    if isinstance(value, FrozenSequence):
+        return list(value)
+    return str(value)
+
+
+class _ResolvedReleases(typing.Sequence[str]):
+    """Sequence of releases that are resolved only when accessed."""
+
+    def __init__(
+        self,
+        resolve: typing.Callable[[typing.Dict], str],
+        releases: typing.List[typing.Dict],
+    ) -> None:
+        self._resolve = resolve
+        self._releases = releases
+
+    def __len__(self) -> int:
+        return len(self._releases)
+
+    def __getitem__(self, index: typing.Any) -> typing.Any:
+        if isinstance(index, slice):
+            return [self._resolve(release) for release in self._releases[index]]
+        return self._resolve(self._releases[index])
@@ -0,0 +1,173 @@
+"""Serializers used for the entry and release files."""
+
+import json
+import logging
+import re
+import typing
+
+YAML_BACKENDS = ("auto", "ruamel", "pyyaml")
+STORAGE_FORMATS = ("yaml", "json")
+
+# implicit types of the YAML 1.2 core schema, as resolved by `ruamel.yaml`
+CORE_SCHEMA_RESOLVERS = (
+    (
+        "tag:yaml.org,2002:bool",
+        re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"),
+        "tTfF",
+    ),
+    (
+        "tag:yaml.org,2002:int",
+        re.compile(
+            r"^[-+]?(?:0b[01_]+|0o[0-7_]+|0x[0-9a-fA-F_]+|[0-9][0-9_]*)$",
+        ),
+        "-+0123456789",
+    ),
+    (
+        "tag:yaml.org,2002:float",
+        re.compile(
+            r"^(?:[-+]?[0-9][0-9_]*\.[0-9_]*(?:[eE][-+]?[0-9]+)?"
+            r"|[-+]?\.[0-9][0-9_]*(?:[eE][-+]?[0-9]+)?"
+            r"|[-+]?[0-9][0-9_]*[eE][-+]?[0-9]+"
+            r"|[-+]?\.(?:inf|Inf|INF)"
+            r"|\.(?:nan|NaN|NAN))$"
+        ),
+        "-+0123456789.",
+    ),
+)
+
+
+def _get_pyyaml(require_libyaml: bool) -> typing.Any:
+    """Get the PyYAML module, if it is installed (and built with libyaml if required)."""
+    try:
+        import yaml  # type: ignore
+    except ImportError:
+        return None
+    if require_libyaml and not getattr(yaml, "__with_libyaml__", False):
+        return None
+    return yaml
+
+
+def _construct_int(loader: typing.Any, node: typing.Any) -> int:
+    value = loader.construct_scalar(node).replace("_", "")
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("-+")
+    base = {"0b": 2, "0o": 8, "0x": 16}.get(value[:2])
+    if base is not None:
+        return sign * int(value[2:], base)
+    return sign * int(value)
+
+
+def _with_core_schema(base: typing.Any) -> typing.Any:
+    """Create a PyYAML loader or dumper class, which resolves the plain scalars
+    according to the YAML 1.2 core schema, like `ruamel.yaml` does.
+
+    PyYAML implements YAML 1.1, where e.g. `no` is a boolean and `1:20` is an
+    integer, so such values would change their type after a round trip.
+    """
+    core_tags = {tag for tag, _, _ in CORE_SCHEMA_RESOLVERS}
+
+    class CoreSchema(base):  # type: ignore
+        yaml_implicit_resolvers = {
+            first: [item for item in resolvers if item[0] not in core_tags]
+            for first, resolvers in base.yaml_implicit_resolvers.items()
+        }
+
+    for tag, regexp, first in CORE_SCHEMA_RESOLVERS:
+        CoreSchema.add_implicit_resolver(tag, regexp, list(first))
+    if hasattr(CoreSchema, "add_constructor"):
+        CoreSchema.add_constructor("tag:yaml.org,2002:int", _construct_int)
+    return CoreSchema
+
+
+class YamlSerializer:
+    """Load and dump the entry and release files with the selected YAML backend.
+
+    Available backends:
+     - ``ruamel`` - the ``ruamel.yaml`` safe loader and dumper, which use the C
+       extension if ``ruamel.yaml.clib`` is installed,
+     - ``pyyaml`` - PyYAML, with the libyaml based loader and dumper if available,
+     - ``auto`` - load with the libyaml based PyYAML loader if available. The files
+       are always dumped with ``ruamel.yaml``, so their format doesn't depend on
+       the installed packages.
+
+    If PyYAML is not installed, ``ruamel.yaml`` is used instead. Both backends
+    use the YAML 1.2 core schema, so the plain scalars like `no` or `1:20` are
+    always loaded as strings.
+    """
+
+    def __init__(self, backend: str = "auto") -> None:
+        self._ruamel: typing.Any = None
+        self._pyyaml: typing.Any = None
+        self._loader: typing.Any = None
+        self._dumper: typing.Any = None
+        self._backend = ""
+        self.backend = backend
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: str) -> None:
+        if backend not in YAML_BACKENDS:
+            raise ValueError(f"Unknown YAML backend: {backend}")
+        if backend == self._backend:
+            return
+        self._backend = backend
+        self._pyyaml = self._loader = self._dumper = None
+        if backend != "ruamel":
+            self._pyyaml = _get_pyyaml(require_libyaml=backend == "auto")
+            if self._pyyaml is None:
+                logging.debug(f"PyYAML is not available for the '{backend}' backend.")
+
+    @property
+    def ruamel(self) -> typing.Any:
+        if self._ruamel is None:
+            from ruamel.yaml import YAML  # type: ignore
+
+            self._ruamel = YAML(typ="safe")
+            self._ruamel.default_flow_style = False
+        return self._ruamel
+
+    def load(self, stream: typing.Union[str, typing.IO[str]]) -> typing.Any:
+        if self._pyyaml is None:
+            return self.ruamel.load(stream)
+        if self._loader is None:
+            self._loader = _with_core_schema(
+                getattr(self._pyyaml, "CSafeLoader", self._pyyaml.SafeLoader)
+            )
+        return self._pyyaml.load(stream, Loader=self._loader)
+
+    def dump(self, data: typing.Any, stream: typing.IO[str]) -> None:
+        if self._pyyaml is None or self._backend == "auto":
+            self.ruamel.dump(data, stream)
+            return
+        if self._dumper is None:
+            self._dumper = _with_core_schema(
+                getattr(self._pyyaml, "CSafeDumper", self._pyyaml.SafeDumper)
+            )
+        self._pyyaml.dump(
+            data,
+            stream,
+            Dumper=self._dumper,
+            default_flow_style=False,
+            allow_unicode=True,
+        )
+
+
+class JsonSerializer:
+    """Load and dump the entry and release files in the JSON format.
+
+    Dates, which can appear in hand-written YAML files, are dumped as strings.
+    """
+
+    def load(self, stream: typing.Union[str, typing.IO[str]]) -> typing.Any:
+        if isinstance(stream, str):
+            return json.loads(stream)
+        return json.load(stream)
+
+    def dump(self, data: typing.Any, stream: typing.IO[str]) -> None:
+        json.dump(
+            data, stream, indent=2, sort_keys=True, ensure_ascii=False, default=str
+        )
+        stream.write("\n")
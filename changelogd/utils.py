@@ -1,12 +1,28 @@
 import logging
+import os
 import subprocess
 import typing
 from pathlib import Path
 
+from .git import GIT_ENVIRONMENT
+from .git import GitRepository
+from .git import UnsupportedRepository
+from .metrics import metrics
+
 
 def get_git_data() -> typing.Optional[typing.Tuple[str, str]]:
+    repository = GitRepository.discover()
+    if repository is not None:
+        try:
+            name = repository.get_config_value("user.name")
+            email = repository.get_config_value("user.email")
+        except (UnsupportedRepository, OSError) as exc:
+            logging.debug(f"Cannot read the git configuration directly: {exc}")
+        else:
+            return name or "", email or ""
     try:
-        git_data = subprocess.check_output(["git", "config", "--list"])
+        with metrics.phase("git"):
+            git_data = subprocess.check_output(["git", "config", "--list"])
     except subprocess.CalledProcessError:
         logging.info("Cannot read git data.")
         return None
@@ -22,12 +38,57 @@ def get_git_data() -> typing.Optional[typing.Tuple[str, str]]:
     return data.get("user.name", ""), data.get("user.email", "")
 
 
-def add_to_git(path: typing.Union[Path, str]) -> None:
-    process = subprocess.Popen(
-        ["git", "add", str(path)], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
-    _, err = process.communicate()
-    if process.returncode == 0:
-        logging.info(f"Added to git: {path}")
-    else:
-        logging.error(f"Failed to add to git: {err.decode()}")
+# the git messages are logged, so they are not localized
+GIT_COMMAND_ENVIRONMENT = {"LC_ALL": "C", "LANGUAGE": "C"}
+
+
+class GitStager:
+    """Collect paths created, renamed or removed during an operation, and stage
+    them all at once.
+
+    The paths are passed to a single `git update-index --add --remove` call
+    through its standard input, so the removed files are staged as deletions,
+    and the removed files that were never tracked are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._paths: typing.Dict[str, None] = {}
+
+    def add(self, *paths: typing.Union[Path, str]) -> None:
+        for path in paths:
+            self._paths[str(path)] = None
+
+    @metrics.timed("git")
+    def stage(self) -> bool:
+        """Stage the collected paths, return False if git failed to stage them.
+
+        Nothing is staged outside of a git repository.
+        """
+        paths = list(self._paths)
+        self._paths.clear()
+        if not paths or not _is_inside_repository():
+            return True
+
+        process = subprocess.Popen(
+            ["git", "update-index", "--add", "--remove", "-z", "--stdin"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, **GIT_COMMAND_ENVIRONMENT},
+        )
+        _, err = process.communicate(
+            b"".join(os.fsencode(path) + b"\0" for path in paths)
+        )
+        if process.returncode:
+            logging.error(f"Failed to add to git: {err.decode()}")
+            return False
+        logging.info(f"Added to git: {', '.join(paths)}")
+        return True
+
+
+def _is_inside_repository() -> bool:
+    """Check if the current directory may be within a git repository."""
+    if any(name in os.environ for name in GIT_ENVIRONMENT):
+        return True
+    directory = Path.cwd().absolute()
+    return any((parent / ".git").exists() for parent in (directory, *directory.parents))
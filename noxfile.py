@@ -42,3 +42,27 @@ def publish(session):
     if "prod" not in session.posargs:
         twine_command.extend(["--repository-url", "https://test.pypi.org/legacy/"])
     session.run(*twine_command)
+
+
+@nox.session
+def importtime(session):
+    """Show the import times of the command line interface."""
+    session.install(".")
+    session.run("python", "-X", "importtime", "-m", "changelogd", "--help")
+
+
+@nox.session
+def benchmark(session):
+    """Compare the speed of the YAML backends."""
+    session.install(".[speedups]")
+    session.run("python", "benchmarks/yaml_backends.py", *session.posargs)
+
+
+@nox.session
+def benchmark_commands(session):
+    """Measure the commands on synthetic repositories.
+
+    Pass the options after `--`, e.g. `nox -s benchmark_commands -- --scales 10,100000`.
+    """
+    session.install(".")
+    session.run("python", "benchmarks/commands.py", *session.posargs)
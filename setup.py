@@ -31,6 +31,8 @@ dev_requirements = [
     "mypy==1.9.0",
 ]
 
+speedups_requirements = ["PyYAML"]
+
 docs_requirements = [
     "setuptools",
     "sphinx",
@@ -65,6 +67,7 @@ setup(
         "test": test_requirements,
         "dev": dev_requirements,
         "docs": docs_requirements,
+        "speedups": speedups_requirements,
     },
     license="MIT license",
     long_description=readme,
@@ -7,6 +7,7 @@ from pathlib import Path
 import pytest
 from click.testing import CliRunner
 
+from changelogd import computed_values
 from changelogd import config
 
 old_invoke = CliRunner.invoke
@@ -21,6 +22,14 @@ def invoke(*args, **kwargs):
 CliRunner.invoke = invoke
 
 
+@pytest.fixture(autouse=True)
+def clear_computed_values():
+    # the computed values are memoized for the whole process
+    computed_values.clear_cache()
+    yield
+    computed_values.clear_cache()
+
+
 @pytest.fixture
 def setup_env(fake_process, monkeypatch, tmpdir, fake_date):
     fake_process.allow_unregistered(True)
@@ -0,0 +1,103 @@
+import json
+import os
+
+from ruamel.yaml import YAML
+
+from changelogd import cache as cache_module
+from changelogd.cache import ReleaseCache
+
+yaml = YAML(typ="safe")
+
+
+def _write_release(path, version):
+    with path.open("w") as release_fh:
+        yaml.dump({"entries": {}, "release_version": version}, release_fh)
+
+
+def _fail_loader(_):
+    raise AssertionError("The release file shall not be parsed.")
+
+
+def test_release_cache(tmp_path):
+    cache_dir = tmp_path / ".cache"
+    release_path = tmp_path / "0.1.0.yaml"
+    _write_release(release_path, "1.0")
+
+    cache = ReleaseCache(cache_dir)
+    assert cache.load(release_path, yaml.load) == {
+        "entries": {},
+        "release_version": "1.0",
+    }
+    cache.save()
+    assert sorted(os.listdir(cache_dir)) == [".gitignore", "releases.json"]
+
+    # unchanged file is served without parsing, even after rename
+    cache = ReleaseCache(cache_dir)
+    data = cache.load(release_path, _fail_loader)
+    assert data["release_version"] == "1.0"
+    # returned data can be modified without affecting the cache
+    data["id"] = 0
+    assert "id" not in cache.load(release_path, _fail_loader)
+
+    renamed_path = tmp_path / "1.1.0.yaml"
+    release_path.rename(renamed_path)
+    assert cache.load(renamed_path, _fail_loader)["release_version"] == "1.0"
+    cache.save()
+
+    with (cache_dir / "releases.json").open() as cache_fh:
+        assert list(json.load(cache_fh)["items"]) == [renamed_path.as_posix()]
+
+    # changed file is parsed again
+    _write_release(renamed_path, "1.1")
+    cache = ReleaseCache(cache_dir)
+    assert cache.load(renamed_path, yaml.load)["release_version"] == "1.1"
+
+
+def test_release_cache_invalid(tmp_path):
+    cache_dir = tmp_path / ".cache"
+    cache_dir.mkdir()
+    with (cache_dir / "releases.json").open("w") as cache_fh:
+        cache_fh.write("{not a json")
+
+    release_path = tmp_path / "0.1.0.yaml"
+    with release_path.open("w") as release_fh:
+        release_fh.write("release_date: 2020-02-02\nrelease_version: '1.0'\n")
+
+    cache = ReleaseCache(cache_dir)
+    data = cache.load(release_path, yaml.load)
+    assert data["release_version"] == "1.0"
+    # dates cannot be stored in JSON, so the file is not cached at all
+    cache.save()
+    with (cache_dir / "releases.json").open() as cache_fh:
+        assert cache_fh.read() == "{not a json"
+
+    # cache directory is not configured
+    cache = ReleaseCache(None)
+    assert cache.load(release_path, yaml.load)["release_version"] == "1.0"
+    cache.save()
+
+
+def test_release_cache_other_version(tmp_path, monkeypatch):
+    cache_dir = tmp_path / ".cache"
+    release_path = tmp_path / "0.1.0.yaml"
+    _write_release(release_path, "1.0")
+    cache = ReleaseCache(cache_dir)
+    cache.load(release_path, yaml.load)
+    cache.save()
+
+    assert ReleaseCache(cache_dir).load(release_path, _fail_loader)
+
+    # the cache written by another changelogd version is not used
+    monkeypatch.setattr(cache_module, "CACHE_VERSION", "1-0.0.0")
+    parsed = []
+
+    def _loader(content):
+        parsed.append(content)
+        return yaml.load(content)
+
+    cache = ReleaseCache(cache_dir)
+    assert cache.load(release_path, _loader)["release_version"] == "1.0"
+    assert len(parsed) == 1
+    cache.save()
+    with (cache_dir / "releases.json").open() as cache_fh:
+        assert json.load(cache_fh)["version"] == "1-0.0.0"
@@ -4,17 +4,23 @@
 
 import datetime
 import glob
+import json
 import os
+import pstats
 import sys
 from pathlib import Path
 
 import click
 from click.testing import CliRunner
+import pytest
 from ruamel.yaml import YAML
 
+from changelogd import archive
+from changelogd import changelogd
 from changelogd import cli
 from changelogd import commands
 from changelogd import config
+from changelogd import resolver
 from tests.conftest import FakeDateTime
 
 if sys.version_info >= (3, 8):
@@ -312,6 +318,100 @@ def test_partial_releases(setup_env, caplog, fake_date):
     assert changelog_before != _read_changelog(setup_env)
 
 
+def test_output_written_if_changed(setup_env, caplog, fake_date):
+    runner = CliRunner()
+    output_path = setup_env / "changelog.md"
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+    _create_entry(runner, "1", "1", "First entry")
+    assert runner.invoke(commands.partial).exit_code == 0
+    output_stat = os.stat(output_path)
+
+    # the output file isn't touched, if the content is the same
+    caplog.clear()
+    assert runner.invoke(commands.partial).exit_code == 0
+    assert caplog.messages == [f"Changelog file {output_path} is up to date"]
+    assert os.stat(output_path).st_mtime_ns == output_stat.st_mtime_ns
+    assert os.stat(output_path).st_ino == output_stat.st_ino
+
+    # the digest of the output file content is kept in the cache directory
+    with open(setup_env / "changelog.d" / ".cache" / "outputs.json") as digests_fh:
+        digests = json.load(digests_fh)["items"]
+    assert list(digests) == [Path(os.path.realpath(output_path)).as_posix()]
+
+    # the modified output file is replaced
+    with open(output_path, "a") as output_fh:
+        output_fh.write("Manual change\n")
+    caplog.clear()
+    assert runner.invoke(commands.partial).exit_code == 0
+    assert caplog.messages == [f"Generated changelog file to {output_path}"]
+    assert "Manual change" not in _read_changelog(setup_env)
+    assert glob.glob(str(setup_env / "*.tmp")) == []
+
+
+def test_partial_check_fingerprint(setup_env, monkeypatch, caplog, fake_date):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+    _create_entry(runner, "1", "1", "First entry")
+    assert runner.invoke(commands.release, ["1.0"], "\n").exit_code == 0
+    _create_entry(runner, "1", "2", "Second entry")
+    assert runner.invoke(commands.partial).exit_code == 0
+
+    # with the same inputs, neither the files are parsed nor templates rendered
+    def _fail(*args, **kwargs):
+        raise AssertionError("The inputs shall not be processed.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelogd, "_create_new_release", _fail)
+        patch.setattr(changelogd, "_prepare_releases", _fail)
+        patch.setattr(resolver.Resolver, "stream_resolve", _fail)
+        caplog.clear()
+        partial = runner.invoke(commands.partial, ["--check"])
+        assert partial.exit_code == 0
+        assert caplog.messages == [
+            f"Changelog file {setup_env / 'changelog.md'} is up to date"
+        ]
+
+        # any change of the inputs requires the full check
+        _create_entry(runner, "2", "3", "Third entry")
+        partial = runner.invoke(commands.partial, ["--check"])
+        assert isinstance(partial.exception, AssertionError)
+
+    partial = runner.invoke(commands.partial, ["--check"])
+    assert partial.exit_code == 1
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+
+    # the same applies to the templates
+    with open(setup_env / "changelog.d" / "templates" / "entry.md", "a") as entry_fh:
+        entry_fh.write("\n")
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 1
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+
+    # including the nested ones
+    templates_dir = setup_env / "changelog.d" / "templates"
+    (templates_dir / "partials").mkdir()
+    with open(templates_dir / "partials" / "footer.md", "w") as footer_fh:
+        footer_fh.write("Footer 1")
+    with open(templates_dir / "main.md", "a") as main_fh:
+        main_fh.write("{% include 'partials/footer.md' %}")
+    assert runner.invoke(commands.partial).exit_code == 0
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+    with open(templates_dir / "partials" / "footer.md", "w") as footer_fh:
+        footer_fh.write("Footer 2")
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 1
+    assert _read_changelog(setup_env).endswith("Footer 2")
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+
+    # the modified output file is checked again
+    with open(setup_env / "changelog.md", "a") as output_fh:
+        output_fh.write("Manual change\n")
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 1
+
+
 def test_empty_release(setup_env, caplog):
     """
     This is also a regression. The program was crashing when there was
@@ -442,6 +542,8 @@ def _read_changelog(tmpdir):
 def _list_directory(directory):
     output = []
     for root, dirs, files in os.walk(directory):
+        # the cache content is not a part of the changelog data
+        dirs[:] = [dir_ for dir_ in dirs if dir_ != ".cache"]
         for file_ in files:
             output.append((Path(root) / file_).relative_to(directory).as_posix())
 
@@ -561,13 +663,11 @@ def test_hotfix_release_between_versions(setup_env, monkeypatch, fake_date):
     changelog = _read_changelog(setup_env)
     assert changelog == HEADER + CHANGELOG_1_11 + CHANGELOG_1_10_1 + CHANGELOG_1_10
 
-    # verify the release files were renumbered correctly
+    # verify the hotfix got a sub-id, and the existing files weren't renamed
     directory_after = _list_directory(setup_env)
     assert "changelog.d/releases/0.1.10.yaml" in directory_after
-    assert "changelog.d/releases/1.1.10.1.yaml" in directory_after
-    assert "changelog.d/releases/2.1.11.yaml" in directory_after
-    # Ensure the old 1.1.11.yaml no longer exists (it was renumbered to 2.1.11.yaml)
-    assert "changelog.d/releases/1.1.11.yaml" not in directory_after
+    assert "changelog.d/releases/0-1.1.10.1.yaml" in directory_after
+    assert "changelog.d/releases/1.1.11.yaml" in directory_after
 
 
 def test_hotfix_release_at_beginning(setup_env, monkeypatch, fake_date):
@@ -623,7 +723,7 @@ def test_hotfix_release_at_beginning(setup_env, monkeypatch, fake_date):
 
 def test_multiple_hotfix_insertions(setup_env, monkeypatch, fake_date):
     """
-    Test multiple hotfix insertions to verify repeated renumbering works.
+    Test multiple hotfix insertions to verify the sub-ids keep the order.
     """
     monkeypatch.setattr(datetime, "datetime", FakeDateTime)
 
@@ -647,26 +747,20 @@ def test_multiple_hotfix_insertions(setup_env, monkeypatch, fake_date):
     # verify files before second insertion
     directory_before_second = _list_directory(setup_env)
     assert "changelog.d/releases/0.1.0.yaml" in directory_before_second
-    assert "changelog.d/releases/1.1.1.yaml" in directory_before_second
-    assert "changelog.d/releases/2.2.0.yaml" in directory_before_second
-    assert "changelog.d/releases/3.3.0.yaml" in directory_before_second
+    assert "changelog.d/releases/0-1.1.1.yaml" in directory_before_second
+    assert "changelog.d/releases/1.2.0.yaml" in directory_before_second
+    assert "changelog.d/releases/2.3.0.yaml" in directory_before_second
 
     # insert 1.0.1 between 1.0 and 1.1
     _create_entry(runner, "2", "", "Bugfix for 1.0.1")
     release = runner.invoke(commands.release, ["1.0.1"], "Hotfix 1.0.1\n")
     assert release.exit_code == 0
 
-    # verify all files exist with correct numbering after second insertion
+    # only the new release file is added by the second insertion
     directory_after_second = _list_directory(setup_env)
-    assert "changelog.d/releases/0.1.0.yaml" in directory_after_second
-    assert "changelog.d/releases/1.1.0.1.yaml" in directory_after_second
-    assert "changelog.d/releases/2.1.1.yaml" in directory_after_second
-    assert "changelog.d/releases/3.2.0.yaml" in directory_after_second
-    assert "changelog.d/releases/4.3.0.yaml" in directory_after_second
-    # Ensure old files are gone (renumbered)
-    assert "changelog.d/releases/1.1.1.yaml" not in directory_after_second
-    assert "changelog.d/releases/2.2.0.yaml" not in directory_after_second
-    assert "changelog.d/releases/3.3.0.yaml" not in directory_after_second
+    assert sorted(set(directory_after_second) - set(directory_before_second)) == [
+        "changelog.d/releases/0-0-1.1.0.1.yaml"
+    ]
 
     # verify changelog ordering: 3.0 > 2.0 > 1.1 > 1.0.1 > 1.0
     changelog = _read_changelog(setup_env)
@@ -676,3 +770,671 @@ def test_multiple_hotfix_insertions(setup_env, monkeypatch, fake_date):
     pos_1_0_1 = changelog.index("## 1.0.1")
     pos_1_0 = changelog.index("## 1.0 ")  # space to avoid matching 1.0.1
     assert pos_3_0 < pos_2_0 < pos_1_1 < pos_1_0_1 < pos_1_0
+
+    # the plain ids stay integers in the templates, the sub-ids are strings
+    releases = changelogd._prepare_releases(
+        {}, Path(setup_env) / "changelog.d" / "releases"
+    )
+    assert [(rel["id"], rel["release_id"]) for rel in releases] == [
+        (2, "2"),
+        (1, "1"),
+        ("0-1", "0-1"),
+        ("0-0-1", "0-0-1"),
+        (0, "0"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "lower, upper, expected",
+    [
+        (None, None, (0,)),
+        ((3,), None, (4,)),
+        ((3, 2), None, (4,)),
+        ((3,), (4,), (3, 1)),
+        ((3,), (5,), (4,)),
+        ((3, 1), (4,), (3, 2)),
+        ((3,), (3, 1), (3, 0, 1)),
+        ((3,), (3, 0), None),
+        (None, (3,), (2,)),
+        (None, (0, 1), (0,)),
+        (None, (0,), None),
+    ],
+)
+def test_get_id_between(lower, upper, expected):
+    release_id = changelogd._get_id_between(lower, upper)
+    assert release_id == expected
+    if release_id is not None:
+        assert lower is None or lower < release_id
+        assert upper is None or release_id < upper
+
+
+@pytest.mark.parametrize(
+    "versions, new_version, expected",
+    [
+        ([], "1.0", 0),
+        (["1.0", "1.1", "2.0"], "3.0", 3),
+        (["1.0", "1.1", "2.0"], "1.0.1", 1),
+        (["1.0", "1.1", "2.0"], "0.1", 0),
+        (["1.0", "1.1", "2.0"], "1.1", 2),
+        (["1.0", "1.1", "2.0"], "not-a-version", 3),
+        (["1.0", "latest", "2.0"], "1.5", 2),
+        (["1.0", "3.0", "2.0"], "2.5", 1),
+        (["1.0", "3.0", "2.0"], "3.5", 3),
+    ],
+)
+def test_find_insertion_index(versions, new_version, expected):
+    releases = [{"release_version": version} for version in versions]
+    assert changelogd._find_insertion_index(releases, new_version) == expected
+
+    index = changelogd.ReleaseIndex(releases)
+    assert index.find_insertion_index(new_version) == expected
+    assert index.find_insertion_index(new_version) == expected
+
+
+def test_splice_release(setup_env, monkeypatch, fake_date):
+    """
+    Test that with the splice mode enabled only the newest release is loaded,
+    and the output is the same as when the whole changelog is regenerated.
+    """
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    # the output file is read in small blocks
+    monkeypatch.setattr(changelogd, "FILE_BLOCK_SIZE", 7)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["splice_marker"] = "<!-- releases -->"
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "w") as main_fh:
+        main_fh.write(
+            "# Changelog  \n<!-- releases -->"
+            "{% for release in releases %}{{ release }}{% endfor %}\nFooter\n"
+        )
+
+    for version in ("1.0", "2.0"):
+        _create_entry(runner, "1", "", f"Feature for {version}")
+        release = runner.invoke(commands.release, [version], f"Release {version}\n")
+        assert release.exit_code == 0
+
+    loaded = []
+    original_load = changelogd._load_release_file
+
+    def _load_release_file(path, *args, **kwargs):
+        loaded.append(path.name)
+        return original_load(path, *args, **kwargs)
+
+    monkeypatch.setattr(changelogd, "_load_release_file", _load_release_file)
+
+    _create_entry(runner, "2", "", "Bug fix for 3.0")
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    assert loaded == ["1.2.0.yaml"]
+    changelog = _read_changelog(setup_env)
+    assert changelog.startswith(
+        "# Changelog  \n<!-- releases -->\n\n## unreleased (2020-02-02)  \n"
+    )
+
+    # refreshed partial release replaces the previous one
+    loaded.clear()
+    _create_entry(runner, "1", "", "Feature for 3.0")
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    assert loaded == ["1.2.0.yaml"]
+    changelog = _read_changelog(setup_env)
+    assert changelog.count("## unreleased") == 1
+    assert "Feature for 3.0" in changelog
+
+    release = runner.invoke(commands.release, ["3.0"], "Release 3.0\n")
+    assert release.exit_code == 0
+    spliced = _read_changelog(setup_env)
+    assert "## unreleased" not in spliced
+    assert spliced.count("## 3.0") == 1
+
+    # hotfix cannot be spliced, so the whole changelog is generated
+    loaded.clear()
+    _create_entry(runner, "2", "", "Bug fix for 1.0")
+    release = runner.invoke(commands.release, ["1.0.1"], "Release 1.0.1\n")
+    assert release.exit_code == 0
+    assert len(loaded) > 1
+    spliced = _read_changelog(setup_env)
+
+    # compare with the changelog generated from scratch
+    monkeypatch.setattr(changelogd, "_load_release_file", original_load)
+    config_content.pop("splice_marker")
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    assert _read_changelog(setup_env) == spliced
+    assert spliced.endswith(
+        "Release 1.0  \n\n### Features  \n"
+        "* Feature for 1.0 ([@test-user](mailto:user@example.com))"
+        "  \n\nFooter"
+    )
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 8, 2**16])
+def test_find_in_file(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(changelogd, "FILE_BLOCK_SIZE", block_size)
+    path = Path(tmp_path) / "output.md"
+    content = "ab<!-- m -->release\nabc\n<!-- m -->release\nxyz"
+    path.write_text(content)
+
+    assert changelogd._find_in_file(path, ["<!-- m -->", "release\nabc", "x"]) == [
+        [2, 24],
+        [12],
+        [42],
+    ]
+    assert changelogd._read_file_text(path, 12, 11) == "release\nabc"
+    assert "".join(changelogd._iter_file_range(path, 30)) == content[30:]
+    spliced = changelogd._iter_spliced_output(path, 12, "new\n", 24)
+    assert "".join(spliced) == content[:12] + "new\n" + content[24:]
+
+
+def test_splice_release_separator(setup_env, monkeypatch, fake_date):
+    """
+    Test that the splice mode keeps the separators between the releases,
+    which are defined in the main template.
+    """
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["splice_marker"] = "<!-- releases -->"
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "w") as main_fh:
+        main_fh.write(
+            "# Changelog  \n<!-- releases -->\n\n"
+            "{{ releases|join('\n---\n') }}\nFooter\n"
+        )
+
+    for version in ("1.0", "2.0"):
+        _create_entry(runner, "1", "", f"Feature for {version}")
+        release = runner.invoke(commands.release, [version], f"Release {version}\n")
+        assert release.exit_code == 0
+
+    loaded = []
+    original_load = changelogd._load_release_file
+
+    def _load_release_file(path, *args, **kwargs):
+        loaded.append(path.name)
+        return original_load(path, *args, **kwargs)
+
+    monkeypatch.setattr(changelogd, "_load_release_file", _load_release_file)
+
+    for message in ("Bug fix for 3.0", "Feature for 3.0"):
+        _create_entry(runner, "2", "", message)
+        partial = runner.invoke(commands.partial)
+        assert partial.exit_code == 0
+    release = runner.invoke(commands.release, ["3.0"], "Release 3.0\n")
+    assert release.exit_code == 0
+    assert loaded == ["1.2.0.yaml"] * 3
+    spliced = _read_changelog(setup_env)
+    assert spliced.count("\n---\n") == 2
+
+    # compare with the changelog generated from scratch
+    monkeypatch.setattr(changelogd, "_load_release_file", original_load)
+    config_content.pop("splice_marker")
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    assert _read_changelog(setup_env) == spliced
+
+    # the whole changelog is generated if the text around the releases changed
+    config_content["splice_marker"] = "<!-- releases -->"
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "w") as main_fh:
+        main_fh.write(
+            "# Changelog  \n<!-- releases -->\nFooter\n\n"
+            "{{ releases|join('\n***\n') }}\n"
+        )
+    loaded.clear()
+    monkeypatch.setattr(changelogd, "_load_release_file", _load_release_file)
+    _create_entry(runner, "1", "", "Feature for 4.0")
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    assert len(loaded) > 1
+    changelog = _read_changelog(setup_env)
+    assert "\n---\n" not in changelog
+    assert changelog.count("\n***\n") == 3
+
+
+def test_parallel_entries(setup_env, monkeypatch):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    for i in range(10):
+        _create_entry(runner, str(i % 5 + 1), str(i), f"Entry number {i}")
+
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    changelog = _read_changelog(setup_env)
+
+    for jobs in ("0", "3"):
+        # force the full check, it is skipped when the inputs didn't change
+        os.remove(setup_env / "changelog.d" / ".cache" / "outputs.json")
+        partial = runner.invoke(commands.partial, ["--check", "--jobs", jobs])
+        assert partial.exit_code == 0
+        assert _read_changelog(setup_env) == changelog
+
+    draft = runner.invoke(commands.draft, ["-j", "2"], "\n")
+    assert draft.exit_code == 0
+    assert "Entry number 9" in draft.stdout
+
+    release = runner.invoke(commands.release, ["1.0", "--jobs", "2"], "\n")
+    assert release.exit_code == 0
+    assert _count_entry_files(setup_env) == 0
+
+
+def test_profile(setup_env):
+    runner = CliRunner()
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+    _create_entry(runner, "1", "1", "Profiled entry")
+
+    profile_path = setup_env / "draft.prof"
+    draft = runner.invoke(commands.draft, ["--profile", str(profile_path)], "\n")
+    assert draft.exit_code == 0
+    assert "Profiled entry" in draft.stdout
+    assert f"Profile saved to {profile_path}" in draft.stderr
+    assert "Ordered by: cumulative time" in draft.stderr
+
+    stats = pstats.Stats(str(profile_path))
+    assert any(function == "draft" for _, _, function in stats.stats)
+
+    # the profile is saved also when the command fails
+    release = runner.invoke(commands.release, ["1.0"], "\n")
+    assert release.exit_code == 0
+    profile_path = setup_env / "release.prof"
+    release = runner.invoke(commands.release, ["1.0", "--profile", str(profile_path)])
+    assert release.exit_code == 1
+    assert profile_path.exists()
+
+
+def test_metrics_json(setup_env):
+    runner = CliRunner()
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+    for i in range(3):
+        _create_entry(runner, "1", str(i), f"Entry number {i}")
+
+    metrics_path = setup_env / "metrics.json"
+    release = runner.invoke(
+        commands.release, ["1.0", "--metrics-json", str(metrics_path)], "\n"
+    )
+    assert release.exit_code == 0
+    with open(metrics_path) as metrics_fh:
+        metrics = json.load(metrics_fh)
+
+    assert metrics["command"] == "release"
+    assert metrics["exit_code"] == 0
+    assert sorted(metrics["phases"]) == sorted(
+        [
+            "config_discovery",
+            "entry_discovery",
+            "entry_parsing",
+            "release_parsing",
+            "template_compilation",
+            "rendering",
+            "output_writing",
+            "git",
+        ]
+    )
+    for phase in ("entry_discovery", "entry_parsing", "rendering", "output_writing"):
+        assert metrics["phases"][phase]["calls"] >= 1
+        assert metrics["phases"][phase]["seconds"] > 0
+    # the entries and the output are staged in git
+    assert metrics["phases"]["git"]["calls"] == 1
+    assert metrics["seconds"] >= sum(
+        phase["seconds"] for phase in metrics["phases"].values()
+    )
+    if sys.version_info >= (3, 8):
+        entry_parsing = metrics["phases"]["entry_parsing"]
+        assert entry_parsing["files_opened"] == 3
+        assert entry_parsing["bytes_read"] > 0
+        assert metrics["files_opened"] > entry_parsing["files_opened"]
+
+    # the metrics are saved with the exit code when the command fails
+    release = runner.invoke(
+        commands.release, ["1.0", "--metrics-json", str(metrics_path)], "\n"
+    )
+    assert release.exit_code == 1
+    with open(metrics_path) as metrics_fh:
+        assert json.load(metrics_fh)["exit_code"] == 1
+
+
+def _final_release_key(*release):
+    return [0, list(release), [2], [0], [1], [0]]
+
+
+def _read_manifest(tmpdir):
+    with open(tmpdir / "changelog.d" / ".cache" / "manifest.json") as manifest_fh:
+        items = json.load(manifest_fh)["items"]
+    return {
+        name: (row["id"], row["release_version"], row["sort_key"], row["entries"])
+        for name, row in items.items()
+    }
+
+
+def test_release_manifest(setup_env, monkeypatch, fake_date):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    _create_entry(runner, "1", "100", "Feature for 1.10")
+    _create_entry(runner, "2", "101", "Bug fix for 1.10")
+    assert runner.invoke(commands.release, ["1.10"], "\n").exit_code == 0
+    _create_entry(runner, "1", "200", "Feature for 1.11")
+    assert runner.invoke(commands.release, ["1.11"], "\n").exit_code == 0
+    _create_entry(runner, "2", "150", "Hotfix for 1.10")
+    assert runner.invoke(commands.release, ["1.10.1"], "\n").exit_code == 0
+
+    # the inserted release is added to the manifest
+    assert _read_manifest(setup_env) == {
+        "0.1.10.yaml": (
+            "0",
+            "1.10",
+            _final_release_key(1, 10),
+            {"feature": 1, "bug": 1},
+        ),
+        "0-1.1.10.1.yaml": ("0-1", "1.10.1", _final_release_key(1, 10, 1), {"bug": 1}),
+        "1.1.11.yaml": ("1", "1.11", _final_release_key(1, 11), {"feature": 1}),
+    }
+
+    # the versions of the indexed releases are not parsed again
+    parsed = []
+    parse_version = changelogd._parse_version
+
+    def _parse_version(version):
+        parsed.append(version)
+        return parse_version(version)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelogd, "_parse_version", _parse_version)
+        index = changelogd._get_release_index(config.Config())
+        assert index.find_insertion_index("1.10.2") == 2
+        assert parsed == ["1.10.2"]
+
+    # release lookups don't parse the release files
+    def _fail(*args, **kwargs):
+        raise AssertionError("The release file shall not be parsed.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelogd, "_load_release_file", _fail)
+        # neither the parsed releases cache is loaded
+        patch.setattr(changelogd, "ReleaseCache", _fail)
+        release = runner.invoke(commands.release, ["1.11"])
+        assert release.exit_code == 1
+        assert "The release '1.11' already exists." in release.stdout
+
+    # the release index is built once per command
+    get_release_index = changelogd._get_release_index
+    calls = []
+
+    def _get_release_index(config):
+        calls.append(config)
+        return get_release_index(config)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelogd, "_get_release_index", _get_release_index)
+        _create_entry(runner, "1", "300", "Feature for 1.12")
+        assert runner.invoke(commands.release, ["1.12"], "\n").exit_code == 0
+        assert len(calls) == 1
+    os.remove(setup_env / "changelog.d" / "releases" / "2.1.12.yaml")
+
+    # the manifest is validated against the directory listing
+    releases_dir = setup_env / "changelog.d" / "releases"
+    os.remove(releases_dir / "0-1.1.10.1.yaml")
+    with open(releases_dir / "0.1.10.yaml") as release_fh:
+        release_data = yaml.load(release_fh)
+    release_data["release_version"] = "1.10.0"
+    with open(releases_dir / "0.1.10.yaml", "w") as release_fh:
+        yaml.dump(release_data, release_fh)
+
+    entry = runner.invoke(
+        commands.entry,
+        ["--type", "1", "--issue-id", "1", "--message", "Late", "--release", "1.10"],
+    )
+    assert entry.exit_code == 1
+    assert "The release '1.10' doesn't exist." in entry.stdout
+    assert _read_manifest(setup_env) == {
+        "0.1.10.yaml": (
+            "0",
+            "1.10.0",
+            _final_release_key(1, 10),
+            {"feature": 1, "bug": 1},
+        ),
+        "1.1.11.yaml": ("1", "1.11", _final_release_key(1, 11), {"feature": 1}),
+    }
+
+
+def test_entry_appended_to_release(setup_env, monkeypatch, fake_date):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    _create_entry(runner, "1", "100", "Feature for 1.0")
+    assert runner.invoke(commands.release, ["1.0"], "\n").exit_code == 0
+    release_path = setup_env / "changelog.d" / "releases" / "0.1.0.yaml"
+
+    def _add_entry(type_, message):
+        entry = runner.invoke(
+            commands.entry,
+            [
+                "--type",
+                type_,
+                "--message",
+                message,
+                "--issue-id",
+                "1",
+                "--release",
+                "1.0",
+            ],
+        )
+        assert entry.exit_code == 0
+
+    # the release file is rewritten only when the first entry is attached
+    _add_entry("1", "First attached")
+    with open(release_path) as release_fh:
+        content = release_fh.read()
+    assert content.count("appended_entries:\n") == 1
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("The release file shall not be parsed.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelogd, "_load_release_file", _fail)
+        _add_entry("2", "Second attached")
+    with open(release_path) as release_fh:
+        appended_content = release_fh.read()
+    assert appended_content.startswith(content)
+    assert "Second attached" in appended_content[len(content) :]
+
+    # attached entries are merged into the release, newest first
+    release_data = changelogd._load_release_file(Path(release_path))
+    assert "appended_entries" not in release_data
+    assert [entry["message"] for entry in release_data["entries"]["feature"]] == [
+        "First attached",
+        "Feature for 1.0",
+    ]
+    assert [entry["message"] for entry in release_data["entries"]["bug"]] == [
+        "Second attached"
+    ]
+    assert _read_manifest(setup_env)["0.1.0.yaml"][3] == {"feature": 2, "bug": 1}
+
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    changelog = _read_changelog(setup_env)
+    assert changelog.index("First attached") < changelog.index("Feature for 1.0")
+    assert "Second attached" in changelog
+
+
+def _set_config_value(tmpdir, key, value):
+    config_path = tmpdir / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content[key] = value
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+
+
+def test_json_storage_format(setup_env, monkeypatch, fake_date):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    _create_entry(runner, "1", "100", "Feature for 1.0")
+    assert runner.invoke(commands.release, ["1.0"], "\n").exit_code == 0
+
+    _set_config_value(setup_env, "storage_format", "json")
+    _create_entry(runner, "2", "200", "Bug fix for 2.0")
+    assert runner.invoke(commands.release, ["2.0"], "\n").exit_code == 0
+    _create_entry(runner, "1", "300", "Unreleased feature")
+    for release_version in ("1.0", "2.0"):
+        entry = runner.invoke(
+            commands.entry,
+            ["--release", release_version],
+            input=os.linesep.join(["3", "", f"Late docs for {release_version}"]),
+        )
+        assert entry.exit_code == 0
+
+    assert sorted(_list_directory(setup_env / "changelog.d" / "releases")) == [
+        ".gitkeep",
+        "0.1.0.yaml",
+        "1.2.0.json",
+    ]
+    entries = glob.glob(str(setup_env / "changelog.d" / "*.entry.*"))
+    assert [Path(entry).name.startswith("feature.") for entry in entries] == [True]
+    assert entries[0].endswith(".entry.json")
+
+    assert runner.invoke(commands.partial).exit_code == 0
+    changelog = _read_changelog(setup_env)
+    for message in (
+        "Feature for 1.0",
+        "Bug fix for 2.0",
+        "Unreleased feature",
+        "Late docs for 1.0",
+        "Late docs for 2.0",
+    ):
+        assert message in changelog
+
+    # the files can be converted in bulk, without changing the output
+    for storage_format in ("json", "yaml"):
+        migrate = runner.invoke(commands.migrate, ["--format", storage_format])
+        assert migrate.exit_code == 0
+        assert {
+            Path(path).suffix
+            for path in _list_directory(setup_env / "changelog.d")
+            if "releases/0" in path or "releases/1" in path or ".entry." in path
+        } == {f".{storage_format}"}
+        assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+        assert _read_changelog(setup_env) == changelog
+
+
+def test_compact_releases(setup_env, monkeypatch, fake_date):
+    monkeypatch.setattr(datetime, "datetime", FakeDateTime)
+    runner = CliRunner()
+    releases_dir = setup_env / "changelog.d" / "releases"
+
+    init = runner.invoke(commands.init)
+    assert init.exit_code == 0
+
+    for version in ("1.0", "1.1", "1.2", "1.3"):
+        _create_entry(runner, "1", "100", f"Feature for {version}")
+        assert runner.invoke(commands.release, [version], "\n").exit_code == 0
+    changelog = _read_changelog(setup_env)
+
+    compact = runner.invoke(commands.compact, ["--keep", "2"])
+    assert compact.exit_code == 0
+    assert sorted(_list_directory(releases_dir)) == [
+        ".gitkeep",
+        "2.1.2.yaml",
+        "3.1.3.yaml",
+        "archive.pack",
+    ]
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+    assert _read_changelog(setup_env) == changelog
+
+    # archived releases are found using the archive index only
+    def _fail(*args, **kwargs):
+        raise AssertionError("The archived release shall not be decoded.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(archive.ReleaseArchive, "load", _fail)
+        release = runner.invoke(commands.release, ["1.1"])
+        assert release.exit_code == 1
+        assert "The release '1.1' already exists." in release.stdout
+
+    # hotfix release between the archived releases doesn't rewrite the archive
+    archive_mtime = os.stat(releases_dir / "archive.pack").st_mtime_ns
+    _create_entry(runner, "2", "150", "Hotfix for 1.0")
+    assert runner.invoke(commands.release, ["1.0.1"], "\n").exit_code == 0
+    assert sorted(_list_directory(releases_dir)) == [
+        ".gitkeep",
+        "0-1.1.0.1.yaml",
+        "2.1.2.yaml",
+        "3.1.3.yaml",
+        "archive.pack",
+    ]
+    assert os.stat(releases_dir / "archive.pack").st_mtime_ns == archive_mtime
+    release_archive = archive.ReleaseArchive(Path(releases_dir / "archive.pack"))
+    assert [(row["id"], row["name"]) for row in release_archive.rows] == [
+        ("0", "0.1.0.yaml"),
+        ("1", "1.1.1.yaml"),
+    ]
+    release_archive.close()
+    changelog = _read_changelog(setup_env)
+    assert changelog.index("## 1.1 ") < changelog.index("## 1.0.1 ")
+    assert changelog.index("## 1.0.1 ") < changelog.index("## 1.0 ")
+
+    # entries attached to the archived release extract it from the archive
+    entry = runner.invoke(
+        commands.entry,
+        ["--release", "1.0"],
+        input=os.linesep.join(["3", "", "Late docs for 1.0"]),
+    )
+    assert entry.exit_code == 0
+    assert "0.1.0.yaml" in _list_directory(releases_dir)
+    assert runner.invoke(commands.partial).exit_code == 0
+    assert "Late docs for 1.0" in _read_changelog(setup_env)
+
+    compact = runner.invoke(commands.compact, ["--before", "1.3"])
+    assert compact.exit_code == 0
+    assert sorted(_list_directory(releases_dir)) == [
+        ".gitkeep",
+        "3.1.3.yaml",
+        "archive.pack",
+    ]
+    changelog = _read_changelog(setup_env)
+    assert runner.invoke(commands.partial, ["--check"]).exit_code == 0
+    assert _read_changelog(setup_env) == changelog
+
+    compact = runner.invoke(commands.compact, ["--before", "1.3"])
+    assert compact.exit_code == 0
+    assert sorted(_list_directory(releases_dir)) == [
+        ".gitkeep",
+        "3.1.3.yaml",
+        "archive.pack",
+    ]
@@ -113,3 +113,46 @@ def test_custom_path(fs):
     instance = config.Config("/config_dir")
 
     assert str(instance.path) == f"{os.sep}config_dir"
+
+
+def test_frozen_data(fs):
+    fs.create_file(
+        "/config_dir/config.yaml",
+        contents=(
+            "context:\n"
+            "  issues_url: http://repo/issues\n"
+            "message_types:\n"
+            "- name: feature\n"
+            "  title: Features\n"
+        ),
+    )
+    instance = config.Config("/config_dir")
+
+    context = instance.get_context()
+    assert context == {"issues_url": "http://repo/issues"}
+    assert {**context} == {"issues_url": "http://repo/issues"}
+    with pytest.raises(TypeError):
+        context["issues_url"] = "http://other/issues"
+
+    message_types = instance.get_value("message_types")
+    assert message_types[0]["name"] == "feature"
+    assert [dict(item) for item in message_types[:1]] == [
+        {"name": "feature", "title": "Features"}
+    ]
+    with pytest.raises(AttributeError):
+        message_types.append({"name": "bug"})
+    # sequences compare like lists
+    assert message_types == [{"name": "feature", "title": "Features"}]
+    assert message_types == instance.get_value("message_types")
+    assert message_types != ({"name": "feature", "title": "Features"},)
+    # the view is built once, and nothing is copied
+    assert instance.data is instance.data
+    assert message_types._data is instance.data["message_types"]._data
+
+    # explicit copies can be modified without affecting the configuration
+    copied = config.thaw(message_types)
+    copied.append({"name": "bug"})
+    data = instance.get_data()
+    data["context"]["issues_url"] = "http://other/issues"
+    assert len(instance.get_value("message_types")) == 1
+    assert instance.get_context()["issues_url"] == "http://repo/issues"
@@ -68,12 +68,15 @@ def test_entry_help(setup_env):
   Create a new changelog entry.
 
 Options:
-  -v, --verbose    Increase verbosity.
-  --message TEXT   Changelog message
-  --issue-id TEXT  Issue ID
-  --type TEXT      Message type (as number or string).
-  --release TEXT   Attach entry to a release.
-  --help           Show this message and exit.
+  -v, --verbose         Increase verbosity.
+  --profile PATH        Save the cProfile statistics into a file.
+  --metrics-json PATH   Save the phase timings and I/O counters as JSON.
+  --message TEXT        Changelog message
+  --issue-id TEXT       Issue ID
+  --type TEXT           Message type (as number or string).
+  --release TEXT        Attach entry to a release.
+  --from-file FILENAME  Read entries from a JSONL/CSV file ('-' for stdin).
+  --help                Show this message and exit.
 """
 
 
@@ -186,11 +189,14 @@ def test_entry_incorrect_entry_fields(setup_env, caplog):
   Create a new changelog entry.
 
 Options:
-  -v, --verbose     Increase verbosity.
+  -v, --verbose         Increase verbosity.
+  --profile PATH        Save the cProfile statistics into a file.
+  --metrics-json PATH   Save the phase timings and I/O counters as JSON.
   --just-name TEXT
-  --type TEXT       Message type (as number or string).
-  --release TEXT    Attach entry to a release.
-  --help            Show this message and exit.
+  --type TEXT           Message type (as number or string).
+  --release TEXT        Attach entry to a release.
+  --from-file FILENAME  Read entries from a JSONL/CSV file ('-' for stdin).
+  --help                Show this message and exit.
 """
 
     # name contains space, not good
@@ -217,7 +223,9 @@ Options:
     assert "Each 'entry_fields' element needs to have 'name'." in caplog.messages
 
 
-def test_user_data(monkeypatch, fake_process):
+def test_user_data(monkeypatch, fake_process, tmp_path):
+    # outside of a repository, the git data is taken from the `git` command
+    monkeypatch.chdir(tmp_path)
     namespace = SimpleNamespace()
     config = Config()
     config._data = {**DEFAULT_CONFIG}
@@ -227,7 +235,7 @@ def test_user_data(monkeypatch, fake_process):
         ["git", "config", "--list"],
         stdout=("user.name=Some User\n" "user.email=user@example.com\n"),
     )
-    fake_process.register(["git", "add", fake_process.any()])
+    fake_process.register(["git", "update-index", fake_process.any()])
     fake_process.keep_last_process(True)
 
     monkeypatch.setattr(getpass, "getuser", lambda: "test-user")
@@ -288,3 +296,142 @@ def test_user_data(monkeypatch, fake_process):
         "The 'not_exist' variable is not supported in 'user_data'. "
         "Available choices are: 'os_user, git_user, git_email'."
     )
+
+
+def test_entry_options_loaded_once(setup_env, monkeypatch):
+    runner = CliRunner()
+    runner.invoke(commands.init)
+
+    loaded = []
+    original_load_data = Config._load_data
+
+    def _load_data(self):
+        loaded.append(self)
+        return original_load_data(self)
+
+    monkeypatch.setattr(Config, "_load_data", _load_data)
+
+    # the configuration is not loaded by other commands' options
+    draft = runner.invoke(commands.draft, ["--help"])
+    assert draft.exit_code == 0
+    assert loaded == []
+
+    # options are available without reloading the module
+    entry = runner.invoke(
+        commands.entry,
+        ["--type", "feature", "--message", "test message", "--issue-id", "100"],
+    )
+    assert entry.exit_code == 0
+    assert len(loaded) == 1
+
+
+def _read_entries(setup_env):
+    entries = []
+    for path in sorted(glob.glob(str(setup_env / "changelog.d" / "*entry.yaml"))):
+        with open(path) as entry_fh:
+            entry_content = yaml.load(entry_fh)
+        assert entry_content.pop("timestamp")
+        entries.append(dict(entry_content))
+    return sorted(entries, key=lambda entry: entry["message"])
+
+
+def test_bulk_entries(setup_env, fake_process):
+    fake_process.register(["git", "update-index", fake_process.any()], occurrences=2)
+    # the files are staged only within a repository
+    (setup_env / ".git").mkdir()
+    runner = CliRunner()
+    runner.invoke(commands.init)
+
+    entries_path = setup_env / "entries.jsonl"
+    with open(entries_path, "w") as entries_fh:
+        entries_fh.write(
+            '{"type": "feature", "message": "First", "issue_id": "1, 2"}\n'
+            "\n"
+            '{"type": 2, "message": "Second", "issue_id": [3]}\n'
+            '{"type": "doc", "message": "Third"}\n'
+        )
+
+    entry = runner.invoke(commands.entry, ["--from-file", str(entries_path)])
+    assert entry.exit_code == 0
+    user_data = {
+        "git_email": "user@example.com",
+        "git_user": "Some User",
+        "os_user": "test-user",
+    }
+    assert _read_entries(setup_env) == [
+        {"issue_id": ["1", "2"], "message": "First", "type": "feature", **user_data},
+        {"issue_id": ["3"], "message": "Second", "type": "bug", **user_data},
+        {"issue_id": None, "message": "Third", "type": "doc", **user_data},
+    ]
+    # the git data is read once, and all files are staged at once
+    assert fake_process.call_count(["git", "config", "--list"]) == 1
+    assert fake_process.call_count(["git", "update-index", fake_process.any()]) == 1
+
+    # CSV data can be provided from the standard input
+    entry = runner.invoke(
+        commands.entry,
+        ["--from-file", "-"],
+        input='type,message,issue_id\nother,Fourth,"4,5"\n',
+    )
+    assert entry.exit_code == 0
+    assert len(_read_entries(setup_env)) == 4
+    assert _read_entries(setup_env)[1]["issue_id"] == ["4", "5"]
+
+
+def test_bulk_entries_duplicated(setup_env, caplog):
+    runner = CliRunner()
+    runner.invoke(commands.init)
+
+    caplog.clear()
+    entry = runner.invoke(
+        commands.entry,
+        ["--from-file", "-"],
+        input='{"type": "feature", "message": "Same"}\n' * 2,
+    )
+    assert entry.exit_code == 0
+    assert caplog.messages[-1].startswith("Created 2 changelog entries")
+    assert [entry["message"] for entry in _read_entries(setup_env)] == ["Same"] * 2
+
+
+def test_bulk_entries_with_field_options(setup_env):
+    runner = CliRunner()
+    runner.invoke(commands.init)
+
+    for option in (["--message", "Other"], ["--type", "2"]):
+        entry = runner.invoke(
+            commands.entry,
+            ["--from-file", "-", *option],
+            input='{"type": "feature", "message": "Message"}\n',
+        )
+        assert entry.exit_code == 2
+        assert f"Option '{option[0]}' cannot be used with '--from-file'." in (
+            entry.output
+        )
+    assert _read_entries(setup_env) == []
+
+
+def test_bulk_entries_invalid(setup_env):
+    runner = CliRunner()
+    runner.invoke(commands.init)
+
+    entry = runner.invoke(
+        commands.entry,
+        ["--from-file", "-"],
+        input=(
+            '{"type": "feature", "message": "Valid"}\n'
+            '{"type": "feature"}\n'
+            '{"type": "unknown", "message": "Message"}\n'
+            '{"message": "Message", "other": "value"}\n'
+        ),
+    )
+    assert entry.exit_code == 1
+    errors = entry.stdout.splitlines()
+    assert errors[:3] == [
+        "Invalid entries:",
+        "Line 2: the 'message' field is required",
+        "Line 3: No such type: 'unknown'. Available types: "
+        + errors[2].split("Available types: ")[-1],
+    ]
+    assert errors[3] == "Line 4: unknown fields: other"
+    # nothing is created if any of the records is invalid
+    assert _read_entries(setup_env) == []
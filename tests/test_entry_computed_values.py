@@ -1,6 +1,7 @@
 import builtins
 import functools
 import getpass
+import threading
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -9,6 +10,7 @@ from pytest_subprocess import FakeProcess
 from ruamel.yaml import YAML
 
 from changelogd import changelogd
+from changelogd import computed_values
 from changelogd.config import Config
 
 yaml = YAML()
@@ -87,7 +89,7 @@ def test_basic_data(monkeypatch, fp: FakeProcess, fs):
         ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
         stdout="remote_branch_name",
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -132,7 +134,7 @@ def test_matching_regex(monkeypatch, fp: FakeProcess, fs, branches):
         ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
         stdout=remote_branch_name,
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -167,7 +169,7 @@ def test_not_matching_regex(monkeypatch, fp: FakeProcess, fs, caplog):
     fp.register(
         ["git", "rev-parse", "--abbrev-ref", "HEAD"], stdout="local_branch_name"
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -207,7 +209,7 @@ def test_subprocess_failure(monkeypatch, fp: FakeProcess, fs, caplog):
         ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
         returncode=128,
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -252,7 +254,7 @@ def test_default_value(monkeypatch, fp: FakeProcess, fs, caplog):
         ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
         returncode=128,
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -288,7 +290,7 @@ def test_default_not_matching_regex(monkeypatch, fp: FakeProcess, fs, caplog):
     fp.register(
         ["git", "rev-parse", "--abbrev-ref", "HEAD"], stdout="local_branch_name"
     )
-    fp.register(["git", "add", fp.any()])
+    fp.register(["git", "update-index", fp.any()])
     fp.keep_last_process(True)
 
     monkeypatch.setattr(
@@ -306,3 +308,113 @@ def test_default_not_matching_regex(monkeypatch, fp: FakeProcess, fs, caplog):
         caplog.messages[0]
         == "The regex '(?P<value>JIRA-\\d+)' didn't match 'local_branch_name'."
     )
+
+
+def test_values_computed_once(monkeypatch, fp: FakeProcess, fs):
+    namespace = SimpleNamespace()
+    config_path = Path("/fake/path/to/changelog.d")
+    fs.create_file(
+        config_path / "config.yaml",
+        contents=(
+            "message_types:\n"
+            "- name: feature\n"
+            "  title: Features\n"
+            "entry_fields:\n"
+            "- name: branch\n"
+            "  default:\n"
+            "    compute: remote_branch_name\n"
+            "computed_values:\n"
+            "- type: branch_name\n"
+            "- type: local_branch_name\n"
+            "user_data: null\n"
+        ),
+    )
+    config = Config(config_path)
+    fp.register(["git", "rev-parse", "--abbrev-ref", "HEAD"], stdout="local")
+    fp.register(
+        ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
+        returncode=128,
+    )
+    fp.register(["git", "update-index", fp.any()])
+    fp.keep_last_process(True)
+
+    monkeypatch.setattr(
+        YAML, "dump", functools.partial(fake_yaml_dump, namespace=namespace)
+    )
+    # the computed default is empty, so the required field is asked again
+    inputs = iter(["1", "", "", "branch"])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+
+    changelogd.entry(config, None, {})
+    assert namespace.data.pop("timestamp")
+    assert namespace.data == {
+        "type": "feature",
+        "branch": "branch",
+        "branch_name": "local",
+        "local_branch_name": "local",
+    }
+    assert fp.call_count(["git", "rev-parse", "--abbrev-ref", "HEAD"]) == 1
+    assert fp.call_count(["git", "rev-parse", fp.any()]) == 2
+
+
+def test_timeout(monkeypatch, fp: FakeProcess, fs, caplog):
+    namespace = SimpleNamespace()
+    config_path = Path("/fake/path/to/changelog.d")
+    fs.create_file(
+        config_path / "config.yaml",
+        contents=(
+            "message_types:\n"
+            "- name: feature\n"
+            "  title: Features\n"
+            "computed_values:\n"
+            "- type: last_commit_message\n"
+            "  default: default message\n"
+            "  timeout: 0.1\n"
+            "user_data: null\n"
+        ),
+    )
+    config = Config(config_path)
+    fp.register(["git", "update-index", fp.any()])
+
+    hung = threading.Event()
+    monkeypatch.setattr(
+        computed_values, "_value_from_repository", lambda *_: hung.wait(5)
+    )
+    monkeypatch.setattr(
+        YAML, "dump", functools.partial(fake_yaml_dump, namespace=namespace)
+    )
+    monkeypatch.setattr(builtins, "input", lambda _: "1")
+
+    try:
+        changelogd.entry(config, None, {})
+    finally:
+        hung.set()
+    assert namespace.data.pop("timestamp")
+    assert namespace.data == {
+        "type": "feature",
+        "last_commit_message": "default message",
+    }
+    assert (
+        "Computing the 'last_commit_message' value didn't finish within 0.1 seconds."
+        in caplog.messages
+    )
+
+
+def test_invalid_timeout(fp: FakeProcess, fs):
+    config_path = Path("/fake/path/to/changelog.d")
+    fs.create_file(
+        config_path / "config.yaml",
+        contents=(
+            "message_types:\n"
+            "- name: feature\n"
+            "  title: Features\n"
+            "computed_values:\n"
+            "- type: branch_name\n"
+            "  timeout: soon\n"
+            "user_data: null\n"
+        ),
+    )
+    config = Config(config_path)
+
+    with pytest.raises(SystemExit, match="Invalid `timeout` for computed value"):
+        changelogd.entry(config, None, {})
@@ -0,0 +1,145 @@
+import subprocess
+
+import pytest
+
+from changelogd import computed_values
+from changelogd.git import GitRepository
+from changelogd.git import UnsupportedRepository
+from changelogd.utils import get_git_data
+
+
+def _git(repo, *args):
+    return subprocess.check_output(["git", *args], cwd=str(repo)).decode()
+
+
+def _commit(repo, message):
+    (repo / "file").write_text(message)
+    _git(repo, "add", "file")
+    _git(repo, "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    (home / ".gitconfig").write_text(
+        "[user]\n\tname = Global User\n\temail = global@example.com\n"
+    )
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _commit(repo, "First commit")
+    monkeypatch.chdir(repo)
+    return repo
+
+
+def _assert_same_as_git(repo):
+    repository = GitRepository.discover()
+    assert repository.local_branch_name() == _git(
+        repo, "rev-parse", "--abbrev-ref", "HEAD"
+    )
+    assert repository.last_commit_message() == _git(repo, "log", "-1", "--pretty=%B")
+
+
+def test_discover(repo, tmp_path):
+    subdirectory = repo / "sub" / "directory"
+    subdirectory.mkdir(parents=True)
+    repository = GitRepository.discover(subdirectory)
+    assert repository.git_dir == repo / ".git"
+
+    assert GitRepository.discover(tmp_path) is None
+
+
+def test_discover_git_environment(repo, monkeypatch):
+    monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+    assert GitRepository.discover() is None
+
+
+def test_branch_and_commit(repo):
+    _assert_same_as_git(repo)
+
+    _commit(repo, "Subject\n\nBody with\n  indented line\n")
+    _git(repo, "checkout", "-q", "-b", "feature/some-name")
+    _assert_same_as_git(repo)
+
+    # detached HEAD
+    _git(repo, "checkout", "-q", "HEAD~1")
+    _assert_same_as_git(repo)
+
+
+def test_packed_objects(repo):
+    for number in range(5):
+        _commit(repo, f"Commit {number}\n\n" + "Long body line.\n" * number * 50)
+    _git(repo, "gc", "-q", "--aggressive")
+    assert not list((repo / ".git" / "refs" / "heads").iterdir())
+    _assert_same_as_git(repo)
+
+    # deltified commits are read as well
+    _git(repo, "checkout", "-q", "HEAD~2")
+    _assert_same_as_git(repo)
+
+
+def test_remote_branch_name(repo, tmp_path):
+    clone = tmp_path / "clone"
+    _git(tmp_path, "clone", "-q", str(repo), str(clone))
+    _git(clone, "checkout", "-q", "-b", "other", "--track", "origin/main")
+    command = ("rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}")
+
+    repository = GitRepository.discover(clone)
+    assert repository.remote_branch_name() == _git(clone, *command) == "origin/main\n"
+    assert repository.local_branch_name() == "other\n"
+
+    # upstream without remote-tracking branch
+    _git(clone, "checkout", "-q", "-b", "local", "--track", "main")
+    repository = GitRepository.discover(clone)
+    assert repository.remote_branch_name() == _git(clone, *command) == "main\n"
+
+    # no upstream
+    _git(clone, "checkout", "-q", "-b", "no-upstream")
+    with pytest.raises(UnsupportedRepository, match="no upstream configured"):
+        GitRepository.discover(clone).remote_branch_name()
+
+
+def test_ambiguous_ref(repo):
+    _git(repo, "tag", "main")
+    with pytest.raises(UnsupportedRepository, match="ambiguous"):
+        GitRepository.discover().local_branch_name()
+    # git disambiguates the name by itself
+    assert computed_values.local_branch_name() == "heads/main\n"
+
+
+def test_config(repo, tmp_path):
+    assert get_git_data() == ("Global User", "global@example.com")
+
+    (tmp_path / "included").write_text('[user]\n  email = "included@example.com" \n')
+    (repo / ".git" / "config").write_text(
+        (repo / ".git" / "config").read_text() + "[include]\n"
+        "\tpath = ../../included\n"
+        "[user]  # comment\n"
+        '\tname = "Local" User ; comment\n'
+        '[Core "Sub\\\\Section"]\n'
+        "\tflag\n"
+        "\tvalue = continued \\\n"
+        "line\\t\n"
+    )
+    assert get_git_data() == ("Local User", "included@example.com")
+    git_list = _git(repo, "config", "--list").splitlines()
+    config = GitRepository.discover().config()
+    # keys without value are listed without "=", and are boolean `true`
+    assert config.pop("core.Sub\\Section.flag") == ["true"]
+    assert "core.Sub\\Section.flag" in git_list
+    git_values = dict(line.split("=", 1) for line in git_list if "=" in line)
+    assert {key: values[-1] for key, values in config.items()} == git_values
+
+
+def test_config_fallback(repo, fake_process):
+    fake_process.register(
+        ["git", "config", "--list"],
+        stdout="user.name=Conditional\nuser.email=conditional@example.com\n",
+    )
+    (repo / ".git" / "config").write_text('[includeIf "gitdir:~/"]\n\tpath = other\n')
+    assert get_git_data() == ("Conditional", "conditional@example.com")
@@ -0,0 +1,72 @@
+"""Make sure that subcommands load only the dependencies they need."""
+
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = """
+import sys
+
+preloaded = set(sys.modules)
+from changelogd import cli
+
+sys.argv = ["changelogd", *sys.argv[1:]]
+try:
+    cli.main()
+except SystemExit:
+    pass
+print("import-budget", *sorted(set(sys.modules) - preloaded))
+"""
+
+HEAVY_MODULES = {"jinja2", "packaging", "ruamel", "concurrent", "changelogd.changelogd"}
+
+RELEASE_MODULES = {"ruamel", "changelogd.changelogd"}
+
+# modules that are allowed to be imported by the particular subcommand, and the
+# maximum number of all modules it imports
+IMPORT_BUDGETS = [
+    (["--help"], set(), 100),
+    (["--version"], set(), 100),
+    (["init", "--path", "other"], {"ruamel"}, 150),
+    (["entry", "--help"], {"ruamel"}, 150),
+    (["draft", "--help"], set(), 100),
+    (["release", "--help"], set(), 100),
+    (
+        ["entry", "--type", "1", "--message", "Message", "--issue-id", "1"],
+        RELEASE_MODULES,
+        200,
+    ),
+    (["partial"], RELEASE_MODULES | {"jinja2", "packaging"}, 250),
+    # the output is up to date, nothing is rendered
+    (["partial", "--check"], RELEASE_MODULES, 200),
+    (["release", "1.0"], RELEASE_MODULES | {"jinja2", "packaging"}, 250),
+    (["migrate", "--format", "json"], RELEASE_MODULES, 200),
+    (["compact", "--keep", "0"], RELEASE_MODULES | {"packaging"}, 200),
+]
+
+
+def _run(args, cwd):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *args],
+        cwd=str(cwd),
+        input=b"\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    # the output can end with a prompt, without a new line
+    _, _, modules = result.stdout.decode().rpartition("import-budget")
+    return set(modules.split())
+
+
+@pytest.mark.parametrize("args, allowed, max_modules", IMPORT_BUDGETS)
+def test_import_budget(tmp_path, args, allowed, max_modules):
+    _run(["init"], tmp_path)
+    _run(["entry", "--type", "1", "--message", "Entry", "--issue-id", "1"], tmp_path)
+    _run(["partial"], tmp_path)
+
+    modules = _run(args, tmp_path)
+    packages = {module.split(".")[0] for module in modules}
+    assert (packages | modules) & HEAVY_MODULES <= allowed
+    assert len(modules) <= max_modules
@@ -0,0 +1,182 @@
+import copy
+import os
+
+import jinja2
+from click.testing import CliRunner
+from ruamel.yaml import YAML
+
+from changelogd import commands
+from changelogd.config import Config
+from changelogd.resolver import Resolver
+
+yaml = YAML()
+
+RELEASES = [
+    {
+        "entries": {"feature": [{"message": "Test feature", "issue_id": ["100"]}]},
+        "release_version": "1.0",
+        "release_date": "2020-02-02",
+        "release_description": None,
+        "previous_release": None,
+        "id": 0,
+    }
+]
+
+
+def _count_rendered_releases(monkeypatch):
+    rendered = []
+    original = Resolver._resolve_release
+
+    def _resolve_release(self, *args, **kwargs):
+        rendered.append(args[1]["release_version"])
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Resolver, "_resolve_release", _resolve_release)
+    return rendered
+
+
+def test_rendered_releases_cache(setup_env, monkeypatch):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+    rendered = _count_rendered_releases(monkeypatch)
+
+    config = Config()
+    output = Resolver(config).full_resolve(copy.deepcopy(RELEASES))
+    assert "Test feature" in output
+    assert rendered == ["1.0"]
+
+    # nothing has changed, release is taken from cache
+    assert Resolver(Config()).full_resolve(copy.deepcopy(RELEASES)) == output
+    assert rendered == ["1.0"]
+
+    # template change invalidates the cache
+    templates_dir = setup_env / "changelog.d" / "templates"
+    with open(templates_dir / "entry.md", "a") as template_fh:
+        template_fh.write("{% include 'footer.md' %}")
+    with open(templates_dir / "footer.md", "w") as template_fh:
+        template_fh.write("footer-1")
+    assert "footer-1" in Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert rendered == ["1.0", "1.0"]
+
+    # as well as the change in the included template
+    with open(templates_dir / "footer.md", "w") as template_fh:
+        template_fh.write("footer-2")
+    assert "footer-2" in Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert rendered == ["1.0", "1.0", "1.0"]
+
+    # and the change in the context
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["context"]["issues_url"] = "http://other/issues"
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    output = Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert "http://other/issues/100" in output
+    assert rendered == ["1.0", "1.0", "1.0", "1.0"]
+
+
+def test_stream_resolve(setup_env, monkeypatch):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+    rendered = _count_rendered_releases(monkeypatch)
+
+    releases = [
+        {**copy.deepcopy(RELEASES[0]), "release_version": f"1.{i}", "id": i}
+        for i in range(3)
+    ]
+    chunks = Resolver(Config()).stream_resolve(copy.deepcopy(releases))
+    assert next(chunks).startswith("# Changelog")
+    # releases are rendered only when the main template reaches them
+    assert rendered == []
+    output = "".join(chunks)
+    assert rendered == ["1.0", "1.1", "1.2"]
+    assert Resolver(Config()).full_resolve(copy.deepcopy(releases)).endswith(output)
+
+    # the releases sequence supports length and indexing in templates
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "w") as main_fh:
+        main_fh.write("{{ releases|length }}{{ releases[-1] }}")
+    output = Resolver(Config()).full_resolve(copy.deepcopy(releases))
+    assert output.startswith("3\n\n## 1.2 (2020-02-02)")
+
+
+def test_templates_bytecode_cache(setup_env, monkeypatch):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+
+    compiled = []
+    original_compile = jinja2.Environment.compile
+
+    def _compile(self, source, name=None, *args, **kwargs):
+        compiled.append(name)
+        return original_compile(self, source, name, *args, **kwargs)
+
+    monkeypatch.setattr(jinja2.Environment, "compile", _compile)
+
+    output = Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert sorted(compiled) == ["entry.md", "main.md", "release.md"]
+    assert len(os.listdir(setup_env / "changelog.d" / ".cache" / "jinja")) == 3
+
+    # templates are not compiled again
+    compiled.clear()
+    assert Resolver(Config()).full_resolve(copy.deepcopy(RELEASES)) == output
+    assert compiled == []
+
+    # unless they have changed
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "a") as main_fh:
+        main_fh.write("Footer")
+    assert Resolver(Config()).full_resolve(copy.deepcopy(RELEASES)).endswith("Footer")
+    assert compiled == ["main.md"]
+
+
+def test_templates_references_cache(setup_env, monkeypatch):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+
+    parsed = []
+    original_parse = jinja2.Environment.parse
+
+    def _parse(self, source, *args, **kwargs):
+        parsed.append(source)
+        return original_parse(self, source, *args, **kwargs)
+
+    monkeypatch.setattr(jinja2.Environment, "parse", _parse)
+
+    output = Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert len(parsed) == 2
+
+    # references of the unchanged templates are taken from cache
+    parsed.clear()
+    assert Resolver(Config()).full_resolve(copy.deepcopy(RELEASES)) == output
+    assert parsed == []
+
+    # only the changed template and its new reference are parsed
+    templates_dir = setup_env / "changelog.d" / "templates"
+    with open(templates_dir / "entry.md", "a") as template_fh:
+        template_fh.write("{% include 'footer.md' %}")
+    with open(templates_dir / "footer.md", "w") as template_fh:
+        template_fh.write("footer")
+    assert "footer" in Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert len(parsed) == 2
+    assert parsed[0].endswith("{% include 'footer.md' %}")
+    assert parsed[1] == "footer"
+
+
+def test_templates_plain_context(setup_env):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["context"]["labels"] = ["a", "b"]
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+    with open(setup_env / "changelog.d" / "templates" / "main.md", "w") as main_fh:
+        main_fh.write(
+            "{{ labels == ['a', 'b'] }} {{ labels|tojson }} "
+            "{{ {'labels': labels, 'url': issues_url}|tojson }}"
+        )
+
+    output = Resolver(Config()).full_resolve(copy.deepcopy(RELEASES))
+    assert output.startswith('True ["a", "b"] {"labels": ["a", "b"], "url": ')
@@ -0,0 +1,92 @@
+import datetime
+import io
+import os
+
+import pytest
+from click.testing import CliRunner
+from ruamel.yaml import YAML
+
+from changelogd import commands
+from changelogd import serializers
+from changelogd.serializers import YamlSerializer
+
+RELEASE = {
+    "entries": {
+        "feature": [{"issue_id": ["100"], "message": "Zażółć gęślą jaźń", "x": None}]
+    },
+    "release_date": datetime.date(2020, 2, 2),
+    "release_description": "Multi\nline: description",
+    "release_version": "1.0",
+}
+
+
+@pytest.mark.parametrize("backend", serializers.YAML_BACKENDS)
+def test_yaml_serializer(backend):
+    serializer = YamlSerializer(backend)
+    stream = io.StringIO()
+    serializer.dump(RELEASE, stream)
+    assert serializer.load(stream.getvalue()) == RELEASE
+    assert YamlSerializer("ruamel").load(io.StringIO(stream.getvalue())) == RELEASE
+
+
+def test_yaml_serializer_fallback(monkeypatch):
+    monkeypatch.setattr(serializers, "_get_pyyaml", lambda require_libyaml: None)
+    serializer = YamlSerializer("pyyaml")
+    stream = io.StringIO()
+    serializer.dump(RELEASE, stream)
+    assert serializer.load(stream.getvalue()) == RELEASE
+
+    with pytest.raises(ValueError):
+        serializer.backend = "json"
+
+
+def test_invalid_yaml_backend(setup_env):
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+
+    yaml = YAML()
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["yaml_backend"] = "other"
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+
+    result = runner.invoke(commands.entry, ["--type", "1", "--message", "Test"])
+    assert result.exit_code == 1
+    assert "Unknown 'yaml_backend': 'other'" in result.stdout
+
+
+@pytest.mark.parametrize("backend", serializers.YAML_BACKENDS)
+def test_yaml_1_1_scalars_round_trip(setup_env, backend):
+    """The values that are booleans or numbers in YAML 1.1 stay strings."""
+    runner = CliRunner()
+    assert runner.invoke(commands.init).exit_code == 0
+
+    yaml = YAML()
+    config_path = setup_env / "changelog.d" / "config.yaml"
+    with open(config_path) as config_fh:
+        config_content = yaml.load(config_fh)
+    config_content["yaml_backend"] = backend
+    with open(config_path, "w") as config_fh:
+        yaml.dump(config_content, config_fh)
+
+    for message, issue_id in (("No", "on"), ("1:20", "off")):
+        entry = runner.invoke(
+            commands.entry,
+            ["--type", "feature", "--message", message, "--issue-id", issue_id],
+        )
+        assert entry.exit_code == 0
+
+    partial = runner.invoke(commands.partial)
+    assert partial.exit_code == 0
+    with open(setup_env / "changelog.md") as changelog_fh:
+        changelog = changelog_fh.read()
+    assert "): No (" in changelog
+    assert "): 1:20 (" in changelog
+
+    # the entries are loaded with the same backend by the parallel workers
+    os.remove(setup_env / "changelog.md")
+    assert runner.invoke(commands.partial, ["--jobs", "2"]).exit_code == 0
+    with open(setup_env / "changelog.md") as changelog_fh:
+        assert changelog_fh.read() == changelog
@@ -1,11 +1,13 @@
-import logging
 import os
+import subprocess
 
-from changelogd.utils import add_to_git
+from changelogd.utils import GitStager
 from changelogd.utils import get_git_data
 
 
-def test_get_git_data(fake_process):
+def test_get_git_data(fake_process, tmp_path, monkeypatch):
+    # outside of a repository, the git data is taken from the `git` command
+    monkeypatch.chdir(tmp_path)
     fake_process.register_subprocess(
         ["git", "config", "--list"],
         stdout=(
@@ -29,21 +31,78 @@ def test_get_git_data(fake_process):
     assert git_data == ("Some User", "user@example.com")
 
 
-def test_get_git_data_failed(fake_process):
+def test_get_git_data_failed(fake_process, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     fake_process.register_subprocess(["git", "config", "--list"], returncode=1)
     assert get_git_data() is None
 
 
-def test_add_to_git(fake_process, caplog):
-    caplog.set_level(logging.INFO)
-    fake_process.register_subprocess(["git", "add", "/test"])
-    fake_process.register_subprocess(
-        ["git", "add", "/other-test"], returncode=1, stderr="error message"
-    )
+def _git(repo, *args):
+    return subprocess.check_output(["git", *args], cwd=str(repo)).decode()
+
+
+def test_git_stager(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q")
+    for name in ("removed", "renamed", "[special]"):
+        (tmp_path / name).write_text(name)
+    _git(tmp_path, "add", "--all")
+    _git(tmp_path, "-c", "user.name=U", "-c", "user.email=u@e", "commit", "-qm", "init")
+    monkeypatch.chdir(tmp_path)
+
+    stager = GitStager()
+    os.remove(tmp_path / "removed")
+    os.rename(tmp_path / "renamed", tmp_path / "renamed-new")
+    (tmp_path / "created").write_text("created")
+    (tmp_path / "special").write_text("special")
+    (tmp_path / "[special]").write_text("changed")
+    # never staged file removed within the same operation
+    (tmp_path / "temporary").write_text("temporary")
+    os.remove(tmp_path / "temporary")
+    stager.add(tmp_path / "removed", "renamed", "renamed-new", "created")
+    stager.add("[special]", tmp_path / "temporary", "created")
+    stager.stage()
+
+    assert sorted(_git(tmp_path, "status", "--porcelain").splitlines()) == [
+        "?? special",
+        "A  created",
+        "D  removed",
+        "M  [special]",
+        "R  renamed -> renamed-new",
+    ]
+
+
+def test_git_stager_single_call(fake_process, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "first").write_text("first")
+    fake_process.register(["git", "update-index", fake_process.any()])
+    stager = GitStager()
+    stager.add("first", "second")
+    stager.add("third")
+    assert stager.stage()
+    # nothing left to stage
+    assert stager.stage()
+
+    # the created and removed files are staged with a single call
+    assert fake_process.call_count(["git", fake_process.any()]) == 1
+
+
+def test_git_stager_failed(tmp_path, monkeypatch, caplog):
+    _git(tmp_path, "init", "-q")
+    monkeypatch.chdir(tmp_path)
+    # git messages are not localized, whatever the user's locale is
+    monkeypatch.setenv("LANGUAGE", "de")
+    monkeypatch.setenv("LC_ALL", "de_DE.UTF-8")
+
+    stager = GitStager()
+    stager.add(tmp_path / "missing", tmp_path.parent)
+    assert not stager.stage()
+    assert "is outside repository" in caplog.text
 
-    add_to_git("/test")
-    assert "Added to git: /test" in caplog.messages
 
-    caplog.clear()
-    add_to_git("/other-test")
-    assert f"Failed to add to git: error message" in caplog.messages
+def test_git_stager_outside_repository(fake_process, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stager = GitStager()
+    stager.add("first")
+    # no git command is run
+    assert stager.stage()